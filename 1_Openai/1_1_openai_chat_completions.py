@@ -1,11 +1,14 @@
-# pip install openai python-dotenv
+# pip install openai python-dotenv tiktoken
 
 from openai import OpenAI
 from dotenv import load_dotenv
+from conversation_memory import ConversationMemory
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 
-openai = OpenAI()
+# Tokens, latency and cost of every call go to llm_usage.jsonl (python llm_accounting.py)
+openai = instrument_openai(OpenAI())
 
 # First a very basic question
 messages_created = [
@@ -27,13 +30,20 @@ messages_created = [
     }
 ]
 
-response = openai.chat.completions.create(
-    model="gpt-4o-mini",
-    messages=messages_created
-)
+# Resending messages_created as-is grows without bound in a long session.
+# ConversationMemory keeps the recent turns verbatim within a token budget
+#  and folds older turns into a running summary message
+memory = ConversationMemory(openai, system_prompt=messages_created[0]["content"], budget_tokens=2000)
+for message in messages_created[1:-1]:
+    memory.add(message["role"], message["content"])
+
+answer = memory.chat(messages_created[-1]["content"])
+print(answer)
+print(memory.last_report)  # tokens sent vs. what the full history would have cost
 
-print(response)
-print(response.choices[0].message.content)
+answer = memory.chat("And what is the factorial of 10?")
+print(answer)
+print(memory.last_report)
 '''
 # Now let us ask a tougher question
 question = "Please propose a hard, challenging question to assess someone's IQ. Respond only with the question."
@@ -3,6 +3,7 @@
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
+from llm_accounting import instrument_gemini
 
 load_dotenv(override=True)
 
@@ -12,7 +13,8 @@ genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 # ----------------------------
 # First basic question
 # ----------------------------
-model = genai.GenerativeModel("gemini-2.5-flash")
+# Tokens and latency of every call go to llm_usage.jsonl
+model = instrument_gemini(genai.GenerativeModel("gemini-2.5-flash"))
 
 prompt = "What is the factorial of 7?"
 response = model.generate_content(prompt)
@@ -3,8 +3,9 @@
 # Then open a terminal and run the command ollama pull llama3.2 then ollama list
 
 from openai import OpenAI
+from llm_accounting import instrument_openai
 
-ollama = OpenAI(base_url='http://localhost:11434/v1', api_key='ollama')
+ollama = instrument_openai(OpenAI(base_url='http://localhost:11434/v1', api_key='ollama'))
 model_name = "llama3.2:latest"
 
 question = "Please propose a hard, challenging question to assess someone's IQ. Respond only with the question."
@@ -0,0 +1,29 @@
+# One chat client in front of OpenAI, Gemini and Ollama
+# Each request goes to the backend with the best recent latency;
+#  if it fails (or is slow, with hedging) another backend answers instead
+# See llm_router.py for how backends are tracked
+
+from dotenv import load_dotenv
+from llm_router import LLMRouter, default_backends
+
+load_dotenv(override=True)
+
+# hedge_after: if no reply within 3 seconds, also ask the next backend and take the first answer
+router = LLMRouter(default_backends(), hedge_after=3.0)
+
+question = "Please propose a hard, challenging question to assess someone's IQ. Respond only with the question."
+messages = [{"role": "user", "content": question}]
+
+response, backend = router.chat(messages)
+question = response.choices[0].message.content
+print(f"Question ({backend}): {question}")
+
+# Send the question back - it may well be answered by a different backend
+messages = [{"role": "user", "content": question}]
+
+response, backend = router.chat(messages)
+answer = response.choices[0].message.content
+print(f"Answer ({backend}): {answer}")
+
+print()
+router.print_stats()
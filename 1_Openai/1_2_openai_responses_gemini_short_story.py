@@ -3,6 +3,7 @@
 import os
 from dotenv import load_dotenv
 import google.generativeai as genai
+from llm_accounting import instrument_gemini
 
 # Load environment variables
 load_dotenv(override=True)
@@ -11,7 +12,7 @@ load_dotenv(override=True)
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
 # Create a Gemini model client (use flash for speed or pro for accuracy)
-model = genai.GenerativeModel("gemini-2.0-flash")
+model = instrument_gemini(genai.GenerativeModel("gemini-2.0-flash"))
 
 # Example prompt
 prompt = "Write a short story of three lines about an AI Agent who wanted to learn singing."
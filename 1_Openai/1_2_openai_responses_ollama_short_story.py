@@ -1,15 +1,34 @@
 # pip install ollama
 
-import ollama
+import asyncio
+from ollama_pool import OllamaPool
 
 MODEL_NAME = "llama3.2:latest"
 
 prompt = input="Write a short story of three lines about an AI Agent who wanted to learn singing."
 
-# Equivalent to OpenAI's responses.create()
-response = ollama.generate(
-    model=MODEL_NAME,
-    prompt=prompt
-)
+# Keep the model loaded for 30 minutes after the last request (keep_alive)
+#  and allow up to 4 generate requests at the same time
+pool = OllamaPool([MODEL_NAME], keep_alive="30m", max_parallel=4)
 
-print(response['response'])
+async def main():
+    # Pay the model load time once, up front
+    await pool.warm_up()
+
+    # Equivalent to OpenAI's responses.create()
+    response = await pool.generate(prompt, MODEL_NAME)
+    print(response)
+
+    # The model is now warm, so more stories come back without the load delay
+    topics = ["learn painting", "learn cooking", "learn chess"]
+    stories = await pool.generate_many(
+        [f"Write a short story of three lines about an AI Agent who wanted to {t}." for t in topics],
+        MODEL_NAME,
+    )
+    for story in stories:
+        print("\n" + story)
+
+    print()
+    pool.print_stats()
+
+asyncio.run(main())
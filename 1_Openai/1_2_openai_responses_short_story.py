@@ -2,10 +2,15 @@
 
 from openai import OpenAI
 from dotenv import load_dotenv
+from response_cache import CachedOpenAI
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 
-client = OpenAI()
+# Repeated identical requests are served from responses_cache.db
+# Set OPENAI_CACHE_MODE=replay to never hit the network
+# Every call (and whether it was a cache hit) is logged to llm_usage.jsonl
+client = instrument_openai(CachedOpenAI(OpenAI()))
 
 input="Write a short story of three lines about an AI Agent who wanted to learn singing."
 
@@ -1,15 +1,17 @@
 # Analyze an image
 from openai import OpenAI
 from dotenv import load_dotenv
+from upload_registry import UploadRegistry
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 
-client = OpenAI()
+client = instrument_openai(OpenAI())
 
-file = client.files.create(
-    file=open("C:\\code\\agenticai\\1_openai_chat_requests\\animals.pdf", "rb"),
-    purpose="user_data"
-)
+# Uploads animals.pdf only the first time (or when it changes);
+#  later runs reuse the file_id stored in uploads_registry.db
+registry = UploadRegistry(client)
+file_id = registry.upload("C:\\code\\agenticai\\1_openai_chat_requests\\animals.pdf", purpose="user_data")
 
 response = client.responses.create(
     model="gpt-4o-mini",
@@ -19,7 +21,7 @@ response = client.responses.create(
             "content": [
                 {
                     "type": "input_file",
-                    "file_id": file.id,
+                    "file_id": file_id,
                 },
                 {
                     "type": "input_text",
@@ -2,11 +2,12 @@
 
 from openai import OpenAI
 from dotenv import load_dotenv
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 
 
-client = OpenAI()
+client = instrument_openai(OpenAI())
 
 response = client.responses.create(
     model="gpt-4o-mini",
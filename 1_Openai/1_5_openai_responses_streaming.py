@@ -1,24 +1,42 @@
 # Streaming
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
+from stream_metrics import TextStream, MetricsSink
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 openai_api_key = os.getenv('OPENAI_API_KEY')
 
-client = OpenAI()
-
-stream = client.responses.create(
-    model="gpt-4o-mini",
-    input=[
-        {
-            "role": "user",
-            "content": "Say 'double bubble bath' slowly and repeat it 10 times.",
-        },
-    ],
-    stream=True,
-)
-
-for event in stream:
-    print(event)
\ No newline at end of file
+client = instrument_openai(AsyncOpenAI())
+MODEL = "gpt-4o-mini"
+
+async def main():
+    started_at = time.perf_counter()
+    stream = await client.responses.create(
+        model=MODEL,
+        input=[
+            {
+                "role": "user",
+                "content": "Say 'double bubble bath' slowly and repeat it 10 times.",
+            },
+        ],
+        stream=True,
+    )
+
+    # Instead of print(event) for every raw event, collect just the text deltas
+    # and time them: TTFT, gaps between deltas, tokens/sec, total duration
+    consumer = TextStream(stream, model=MODEL, label="double_bubble", started_at=started_at)
+    async for text in consumer:
+        print(text, end="", flush=True)
+
+    print("\n\n" + consumer.metrics.summary())
+
+    # Saved to stream_metrics.db - run `python stream_metrics.py` to compare runs
+    MetricsSink().record(consumer.metrics)
+
+if __name__ == "__main__":
+    asyncio.run(main())
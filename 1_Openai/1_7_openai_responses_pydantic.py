@@ -2,11 +2,15 @@
 
 from openai import OpenAI
 from dotenv import load_dotenv
+from response_cache import CachedOpenAI
+from llm_accounting import instrument_openai
 from pydantic import BaseModel
 
 load_dotenv(override=True)
 
-client = OpenAI()
+# Repeated identical requests are served from responses_cache.db
+# Set OPENAI_CACHE_MODE=replay to never hit the network
+client = instrument_openai(CachedOpenAI(OpenAI()))
 
 class CalendarEvent(BaseModel):
     name: str
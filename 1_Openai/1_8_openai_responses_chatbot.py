@@ -1,19 +1,40 @@
 from openai import OpenAI
 from dotenv import load_dotenv
-from pypdf import PdfReader
-import gradio as gr
+from datetime import datetime
+import csv
+import os
+import time
+from pdf_extract import extract_pdf
+from buffett_retriever import ChunkIndex
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
 
-client = OpenAI()
+client = instrument_openai(OpenAI())
 
 # --- Step 1: Read Buffett PDF into a single string ---
-reader = PdfReader("C://code//agenticai//1_openai_chat_requests//Warren_Buffett.pdf")
+# Pages are extracted in parallel and cached in .pdf_cache, so later starts skip pypdf
+# The text is loaded under __main__ below: the process pool re-imports this file in
+#  every worker, so nothing heavy (gradio, the embedding model) happens at import time
+PDF_PATH = "C://code//agenticai//1_openai_chat_requests//Warren_Buffett.pdf"
 buffett = ""
-for page in reader.pages:
-    text = page.extract_text()
-    if text:
-        buffett += text
+
+# Chunk + embedding index over the whole text, built once and saved in .pdf_cache next to the PDF
+buffett_index = None
+
+# Per-turn latency log: time to first token and total time
+LATENCY_LOG = "chat_latency.csv"
+
+def log_latency(question, ttft, total, chars, cancelled):
+    new_file = not os.path.exists(LATENCY_LOG)
+    with open(LATENCY_LOG, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "question", "ttft_s", "total_s", "chars", "cancelled"])
+        writer.writerow([
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), question,
+            f"{ttft:.3f}" if ttft is not None else "", f"{total:.3f}", chars, int(cancelled),
+        ])
 
 # --- Step 2: Define chat function ---
 def chat_with_buffett(message, history):
@@ -21,46 +42,76 @@ def chat_with_buffett(message, history):
     Chat with Buffett knowledge base using OpenAI Responses API.
     message: user input
     history: previous chat messages (not needed for stateless, but Gradio passes it)
+    Yields the answer so far each time a new piece of text arrives (stream=True, as in 1_5).
     """
-    response = client.responses.create(
+    start = time.perf_counter()
+    ttft, answer, cancelled = None, "", True
+    stream = client.responses.create(
         model="gpt-4o-mini",
         input=[
-            # Pass only the first 4k of Buffett words, ~ 1000 tokens
-            # Avoids overloading: Earlier models supported just 4k tokens, GPT-4o-mini supports ~128k
-            {"role": "system", "content": f"You are a helpful assistant. You can answer based on the following text:\n\n{buffett[:4000]} or from the Internet."},
+            # Pass only the chunks most relevant to this question, ~ 1000 tokens in total
+            # (previously the first 4k characters, whatever the question)
+            {"role": "system", "content": f"You are a helpful assistant. You can answer based on the following text:\n\n{buffett_index.context_for(message)} or from the Internet."},
             {"role": "user", "content": message},
-        ]
+        ],
+        stream=True,
     )
-    return response.output_text
+    try:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                answer += event.delta
+                yield answer
+        cancelled = False
+    finally:
+        # Runs on normal completion and when Gradio cancels the generator (Stop button):
+        # closing the stream drops the HTTP connection so the model stops generating
+        stream.close()
+        log_latency(message, ttft, time.perf_counter() - start, len(answer), cancelled)
 
 # --- Step 3: Build Gradio UI ---
+def build_demo():
+    import gradio as gr  # imported here so pool workers never load it
+
+    # Blocks is a layout system in Gradio, more advanced than 
+    #  gradio.Interface
+    # With creates a context manager, so that all components defined next
+    #  will get added to this demo app
+    with gr.Blocks() as demo: # start defining the UI
+        gr.Markdown("#Ask about Warren Buffett") # means big header
+        
+        chatbot = gr.Chatbot()
+        msg = gr.Textbox(placeholder="Ask a question about Buffett...")
+        with gr.Row():
+            stop = gr.Button("Stop")
+            clear = gr.Button("Clear")
+        
+        # A generator: every yield pushes the partial answer into the chatbot
+        def respond(user_message, chat_history):
+            chat_history = chat_history or []
+            chat_history.append((user_message, ""))
+            for partial in chat_with_buffett(user_message, chat_history):
+                chat_history[-1] = (user_message, partial)
+                yield "", chat_history
+
+        # Syntax: msg.submit(function, inputs, outputs)
+        # When the user clicks ENTER, pass inputs [msg, chatbot] to the chat function
+        # Then take the function's output and add it to the chat history [msg, chatbot]
+        submit_event = msg.submit(respond, [msg, chatbot], [msg, chatbot])
 
-# Blocks is a layout system in Gradio, more advanced than 
-#  gradio.Interface
-# With creates a context manager, so that all components defined next
-#  will get added to this demo app
-with gr.Blocks() as demo: # start defining the UI
-    gr.Markdown("#Ask about Warren Buffett") # means big header
-    
-    chatbot = gr.Chatbot()
-    msg = gr.Textbox(placeholder="Ask a question about Buffett...")
-    clear = gr.Button("Clear")
-    
-    def respond(user_message, chat_history):
-        answer = chat_with_buffett(user_message, chat_history)
-        chat_history.append((user_message, answer))
-        return "", chat_history
+        # The Stop button cancels the running generator, which closes the upstream stream
+        stop.click(None, None, None, cancels=[submit_event])
+        
+        # When the user clicks the "Clear" button, clear the chat history
+        # Run the function lambda: None, which means do nothing
+        # Function takes no inputs (None) and sends its output (None) to the chatbot
+        # This resets the chat history
+        # queue=False means run the function immediately
+        clear.click(lambda: None, None, chatbot, queue=False)
+    return demo
 
-    # Syntax: msg.submit(function, inputs, outputs)
-    # When the user clicks ENTER, pass inputs [msg, chatbot] to the chat function
-    # Then take the function's output and add it to the chat history [msg, chatbot]
-    msg.submit(respond, [msg, chatbot], [msg, chatbot])
-    
-    # When the user clicks the "Clear" button, clear the chat history
-    # Run the function lambda: None, which means do nothing
-    # Function takes no inputs (None) and sends its output (None) to the chatbot
-    # This resets the chat history
-    # queue=False means run the function immediately
-    clear.click(lambda: None, None, chatbot, queue=False)
-    
-demo.launch()
+if __name__ == "__main__":
+    buffett, _ = extract_pdf(PDF_PATH)
+    buffett_index = ChunkIndex.load_or_build(buffett, pdf_path=PDF_PATH)
+    build_demo().launch()
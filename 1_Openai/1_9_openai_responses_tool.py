@@ -1,17 +1,21 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from dotenv import load_dotenv
-from pypdf import PdfReader
+from pdf_extract import extract_pdf
+from buffett_retriever import ChunkIndex
+from llm_accounting import instrument_openai
 
 # -----------------------------
 # 1. Setup and load knowledge base
 # -----------------------------
 load_dotenv(override=True)
-client = OpenAI()
+client = instrument_openai(OpenAI())
 
-reader = PdfReader("C://code//agenticai//1_openai_chat_requests//Warren_Buffett.pdf")
-buffett_text = "".join(
-    page.extract_text() or "" for page in reader.pages
-)
+# Shares the .pdf_cache sidecar with 1_8, loaded under __main__ below
+PDF_PATH = "C://code//agenticai//1_openai_chat_requests//Warren_Buffett.pdf"
+buffett_text = ""
+buffett_index = None
 
 # -----------------------------
 # 2. Define a simple callable tool
@@ -24,28 +28,44 @@ def summarize_text(text: str, length: str = "short") -> str:
     )
     return summary.output_text
 
+# Responses API function tools are flat: name/description/parameters at the top level
 tools = [
     {
-        "name": "summarize_text",
         "type": "function",
-        "function": {
-            "name": "summarize_text",
-            "description": "Summarize the given text concisely.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "text": {"type": "string"},
-                    "length": {
-                        "type": "string",
-                        "enum": ["short", "medium", "long"]
-                    }
-                },
-                "required": ["text"]
-            }
+        "name": "summarize_text",
+        "description": "Summarize the given text concisely.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "text": {"type": "string"},
+                "length": {
+                    "type": "string",
+                    "enum": ["short", "medium", "long"]
+                }
+            },
+            "required": ["text"]
         }
     }
 ]
 
+tool_functions = {
+    "summarize_text": summarize_text,
+}
+
+# Limits for one ask_agent() call
+MAX_ITERATIONS = 5      # model round trips
+MAX_TOTAL_TOKENS = 20000  # input + output tokens across all round trips
+
+def run_tool_call(call):
+    """Execute one function_call item and wrap the result as a function_call_output."""
+    try:
+        args = json.loads(call.arguments or "{}")
+        function = tool_functions[call.name]
+        output = function(**args)
+    except Exception as e:
+        output = f"Error running {call.name}: {e}"
+    return {"type": "function_call_output", "call_id": call.call_id, "output": str(output)}
+
 # -----------------------------
 # 3. Core agent logic
 # -----------------------------
@@ -64,38 +84,62 @@ def ask_agent(prompt: str):
                 # System: You are Warren Buffett’s AI assistant. Use tools if needed.
                 # User: How does Buffett view diversification? (Here’s a chunk of his text)
                 "role": "user",
-                "content": f"{prompt}\n\nReference text:\n{buffett_text[:4000]}"
+                # Only the chunks relevant to this question, not the first 4k characters
+                "content": f"{prompt}\n\nReference text:\n{buffett_index.context_for(prompt)}"
             }
         ],
         tools=tools
     )
+    total_tokens = response.usage.total_tokens if response.usage else 0
+
+    # Tool loop: keep answering tool calls until the model replies with plain text
+    for _ in range(MAX_ITERATIONS - 1):
+        calls = [item for item in response.output if item.type == "function_call"]
+        if not calls:
+            break
+        if total_tokens >= MAX_TOTAL_TOKENS:
+            print(f"(token budget of {MAX_TOTAL_TOKENS} reached, stopping tool loop)")
+            break
+
+        # Several tool calls in one response run at the same time
+        with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+            outputs = list(pool.map(run_tool_call, calls))
 
-    # If the model calls the summarize_text tool
-    if hasattr(response.output[0], "type") and response.output[0].type == "tool_call":
-        tool_call = response.output[0].tool_call
-        if tool_call.function.name == "summarize_text":
-            args = tool_call.function.arguments
-            result = summarize_text(**args)
+        # previous_response_id lets the server keep the conversation (system prompt,
+        # reference text, earlier tool calls), so we only send the new tool outputs
+        response = client.responses.create(
+            model="gpt-4o-mini",
+            previous_response_id=response.id,
+            input=outputs,
+            tools=tools
+        )
+        total_tokens += response.usage.total_tokens if response.usage else 0
 
-            # Give result back to the model for final answer
-            follow_up = client.responses.create(
-                model="gpt-4o-mini",
-                input=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt},
-                    {"role": "assistant", "content": f"Tool result: {result}"}
-                ]
-            )
-            return follow_up.output_text
+    # A limit can stop the loop while the model still waits for tool results:
+    # answer those calls without running them and ask for a final text reply
+    pending = [item for item in response.output if item.type == "function_call"]
+    if pending:
+        response = client.responses.create(
+            model="gpt-4o-mini",
+            previous_response_id=response.id,
+            input=[
+                {"type": "function_call_output", "call_id": call.call_id,
+                 "output": "Not run: tool limit reached. Answer with the information you already have."}
+                for call in pending
+            ],
+            tools=tools,
+            tool_choice="none"
+        )
 
-    # If no tool call was made, return normal model output
-    return response.output_text
+    return response.output_text or "Sorry, I could not complete an answer within the tool limits."
 
 
 # -----------------------------
 # 4. Try it out interactively
 # -----------------------------
 if __name__ == "__main__":
+    buffett_text, _ = extract_pdf(PDF_PATH)
+    buffett_index = ChunkIndex.load_or_build(buffett_text, pdf_path=PDF_PATH)
     print("Warren Buffett Agent Ready!\n(Type 'exit' to quit)\n")
     while True:
         user_input = input("You: ")
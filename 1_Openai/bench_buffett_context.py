@@ -0,0 +1,78 @@
+# Benchmark: fixed buffett[:4000] truncation vs retrieved top-k chunks
+#
+# For each question we ask gpt-4o-mini twice, once with each kind of context,
+# and compare prompt tokens (from response.usage), latency and whether the answer
+# mentions the expected keyword (a simple hit-rate proxy for answer quality).
+#
+#   python bench_buffett_context.py [path/to/Warren_Buffett.pdf]
+
+import sys
+import time
+
+from openai import OpenAI
+from dotenv import load_dotenv
+
+from pdf_extract import extract_pdf
+from buffett_retriever import ChunkIndex
+
+load_dotenv(override=True)
+
+PDF_PATH = "C://code//agenticai//1_openai_chat_requests//Warren_Buffett.pdf"
+MODEL = "gpt-4o-mini"
+
+# (question, keyword we expect a good answer to contain)
+QUESTIONS = [
+    ("Where was Warren Buffett born?", "Omaha"),
+    ("Which company did Buffett turn into his main holding company?", "Berkshire"),
+    ("Who was Buffett's most important teacher?", "Graham"),
+    ("Which university did Buffett attend for his master's degree?", "Columbia"),
+    ("What is Buffett's long-time business partner's name?", "Munger"),
+    ("What has Buffett pledged to do with most of his fortune?", "Gates"),
+]
+
+
+def ask(client, question, context):
+    start = time.perf_counter()
+    response = client.responses.create(
+        model=MODEL,
+        input=[
+            {"role": "system", "content": f"You are a helpful assistant. Answer only from the following text:\n\n{context}"},
+            {"role": "user", "content": question},
+        ],
+    )
+    latency = time.perf_counter() - start
+    return response.output_text, response.usage.input_tokens, latency
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else PDF_PATH
+    client = OpenAI()
+
+    text, _ = extract_pdf(path)
+    start = time.perf_counter()
+    index = ChunkIndex.load_or_build(text, pdf_path=path)
+    print(f"Index ready: {len(index.chunks)} chunks in {time.perf_counter() - start:.2f} seconds\n")
+
+    modes = {
+        "truncate": lambda q: text[:4000],
+        "retrieve": lambda q: index.context_for(q),
+    }
+    totals = {name: {"tokens": 0, "latency": 0.0, "hits": 0} for name in modes}
+
+    for question, keyword in QUESTIONS:
+        for name, make_context in modes.items():
+            answer, tokens, latency = ask(client, question, make_context(question))
+            hit = keyword.lower() in answer.lower()
+            totals[name]["tokens"] += tokens
+            totals[name]["latency"] += latency
+            totals[name]["hits"] += hit
+            print(f"[{name:8}] {tokens:5} tokens {latency:5.2f}s hit={hit}  {question}")
+
+    n = len(QUESTIONS)
+    print(f"\n{'mode':10}{'avg tokens':>12}{'avg latency':>14}{'hit rate':>10}")
+    for name, t in totals.items():
+        print(f"{name:10}{t['tokens'] / n:12.0f}{t['latency'] / n:13.2f}s{t['hits'] / n:10.0%}")
+
+
+if __name__ == "__main__":
+    main()
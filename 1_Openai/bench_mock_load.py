@@ -0,0 +1,147 @@
+# Load benchmark for the 1_Openai call patterns against the offline mock server
+#
+# Each pattern mirrors one of the example scripts:
+#   chat     - chat.completions.create         (1_1)
+#   respond  - responses.create                (1_2, 1_6)
+#   stream   - responses.create(stream=True)   (1_5)
+#   parse    - responses.parse(text_format=..) (1_7)
+#
+# Requests are driven from a thread pool at the given concurrency, either through one
+# shared client (connection reuse) or a new client per request (--new-client).
+# Reported: throughput, p50/p95/p99 latency, client CPU time and peak memory.
+#
+#   python bench_mock_load.py --requests 500 --concurrency 1 8 32 --latency-ms 200
+#   python bench_mock_load.py --base-url http://127.0.0.1:8000/v1   # already running mock
+
+import argparse
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+from pydantic import BaseModel
+
+from mock_openai_server import MockConfig, start_server
+
+
+class CalendarEvent(BaseModel):
+    name: str
+    date: str
+    participants: list[str]
+
+
+def call_chat(client):
+    response = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": "What is the factorial of 7?"}],
+    )
+    return response.choices[0].message.content
+
+
+def call_respond(client):
+    return client.responses.create(
+        model="gpt-4o-mini",
+        instructions="Speak like Sherlock Holmes.",
+        input="Are semicolons optional in JavaScript?",
+    ).output_text
+
+
+def call_stream(client):
+    text = ""
+    for event in client.responses.create(model="gpt-4o-mini", input="Say 'double bubble bath'.", stream=True):
+        if event.type == "response.output_text.delta":
+            text += event.delta
+    return text
+
+
+def call_parse(client):
+    return client.responses.parse(
+        model="gpt-4o-mini",
+        input=[
+            {"role": "system", "content": "Extract the event information."},
+            {"role": "user", "content": "Alice and Bob are going to a picnic on Sunday."},
+        ],
+        text_format=CalendarEvent,
+    ).output_parsed
+
+
+PATTERNS = {"chat": call_chat, "respond": call_respond, "stream": call_stream, "parse": call_parse}
+
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+
+def run(pattern, base_url, requests, concurrency, new_client):
+    shared = OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    call = PATTERNS[pattern]
+    latencies, errors = [], 0
+
+    def one(_):
+        client = OpenAI(base_url=base_url, api_key="mock", max_retries=0) if new_client else shared
+        start = time.perf_counter()
+        try:
+            call(client)
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, e
+        finally:
+            if new_client:
+                client.close()
+
+    tracemalloc.start()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, error in pool.map(one, range(requests)):
+            if error is None:
+                latencies.append(latency)
+            else:
+                errors += 1
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    shared.close()
+
+    latencies.sort()
+    return {
+        "pattern": pattern, "concurrency": concurrency, "ok": len(latencies), "errors": errors,
+        "rps": len(latencies) / wall if wall else 0.0,
+        "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95), "p99": percentile(latencies, 0.99),
+        "cpu_ms_per_req": cpu * 1000 / requests, "peak_mb": peak / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark 1_Openai call patterns against the mock server")
+    parser.add_argument("--patterns", nargs="+", default=list(PATTERNS), choices=list(PATTERNS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--new-client", action="store_true", help="new OpenAI() per request (no connection reuse)")
+    parser.add_argument("--base-url", help="use an already running mock instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if base_url is None:
+        # In-process mock: its threads share the GIL with the client, so CPU numbers
+        # include the server. Start mock_openai_server.py separately for clean CPU figures.
+        config = MockConfig(args.latency_ms, args.jitter, args.tokens_per_sec, args.error_rate)
+        _, base_url = start_server(0, config)
+
+    print(f"Mock at {base_url}, {args.requests} requests per run, "
+          f"{'new client per request' if args.new_client else 'shared client'}, pid {os.getpid()}\n")
+    print(f"{'pattern':9}{'conc':>5}{'ok':>6}{'err':>5}{'req/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'cpu/req':>10}{'peak':>9}")
+    for pattern in args.patterns:
+        for concurrency in args.concurrency:
+            r = run(pattern, base_url, args.requests, concurrency, args.new_client)
+            print(f"{r['pattern']:9}{r['concurrency']:5}{r['ok']:6}{r['errors']:5}{r['rps']:9.1f}"
+                  f"{r['p50']:7.3f}s{r['p95']:7.3f}s{r['p99']:7.3f}s{r['cpu_ms_per_req']:8.2f}ms{r['peak_mb']:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Retrieval-backed context selection for the Buffett scripts
+#
+# Instead of always sending buffett[:4000], the text is split into overlapping
+# chunks once, embedded with the same all-MiniLM-L6-v2 model used in 2_Openai_agents,
+# and saved in the .pdf_cache folder next to the PDF (beside pdf_extract's sidecar).
+# Each question then gets only the top-k most similar chunks that fit into a token budget.
+#
+#   index = ChunkIndex.load_or_build(buffett, pdf_path=PDF_PATH)
+#   context = index.context_for("How does Buffett view diversification?")
+
+import hashlib
+import os
+
+import numpy as np
+
+INDEX_DIR = ".pdf_cache"  # same folder name as pdf_extract.CACHE_DIR
+MODEL_NAME = "all-MiniLM-L6-v2"
+CHUNK_SIZE = 800      # characters
+CHUNK_OVERLAP = 150   # characters shared between neighbouring chunks
+TOP_K = 5
+TOKEN_BUDGET = 1000   # same size as the old buffett[:4000] (~4 characters per token)
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough rule of thumb for English text with OpenAI tokenizers
+    return max(1, len(text) // 4)
+
+
+def chunk_text(text: str, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP) -> list[str]:
+    """Fixed-size chunks that end on whitespace where possible, with overlap."""
+    chunks, start = [], 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + chunk_size // 2, end)
+            if space != -1:
+                end = space
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+class ChunkIndex:
+    def __init__(self, chunks, embeddings, model):
+        self.chunks = chunks
+        self.embeddings = embeddings  # (n, dim) float32, rows are unit length
+        self.model = model
+
+    @classmethod
+    def load_or_build(cls, text: str, model=None, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP,
+                      pdf_path=None):
+        """Saved next to pdf_path (like the text sidecar), or under the CWD without one."""
+        if model is None:
+            # Imported here: scripts importing this module are re-imported by pdf_extract's
+            #  pool workers, which must not load torch
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(MODEL_NAME)
+        key = hashlib.sha256(f"{MODEL_NAME}:{chunk_size}:{overlap}:{text}".encode("utf-8")).hexdigest()
+        folder = os.path.join(os.path.dirname(os.path.abspath(pdf_path)) if pdf_path else "", INDEX_DIR)
+        path = os.path.join(folder, f"{key}.index.npz")
+
+        if os.path.exists(path):
+            data = np.load(path, allow_pickle=False)
+            return cls(data["chunks"].tolist(), data["embeddings"], model)
+
+        chunks = chunk_text(text, chunk_size, overlap)
+        embeddings = model.encode(chunks, batch_size=64, normalize_embeddings=True)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        os.makedirs(folder, exist_ok=True)
+        np.savez(path, chunks=np.array(chunks), embeddings=embeddings)
+        return cls(chunks, embeddings, model)
+
+    def search(self, question: str, k=TOP_K, token_budget=TOKEN_BUDGET):
+        """Returns [(score, chunk)] best first, stopping when the budget is used up."""
+        if not self.chunks:
+            return []
+        query = self.model.encode(question, normalize_embeddings=True)
+        scores = self.embeddings @ np.asarray(query, dtype=np.float32)
+
+        k = min(k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results, used = [], 0
+        for i in top:
+            cost = estimate_tokens(self.chunks[i])
+            if results and used + cost > token_budget:
+                break
+            results.append((float(scores[i]), self.chunks[i]))
+            used += cost
+        return results
+
+    def context_for(self, question: str, k=TOP_K, token_budget=TOKEN_BUDGET) -> str:
+        return "\n\n---\n\n".join(chunk for _, chunk in self.search(question, k, token_budget))
@@ -0,0 +1,288 @@
+# Bulk structured extraction with responses.parse
+#
+# 1_7 extracts one CalendarEvent from one sentence. This runs the same extraction
+# over a whole file of messages:
+#   - inputs are streamed from JSONL ({"id": ..., "text": ...}) or CSV (id,text columns)
+#   - requests run concurrently (bounded) and are throttled by requests/min and tokens/min
+#   - 429 / 5xx / timeouts are retried with exponential backoff and jitter
+#   - every validated result is appended to the output JSONL as soon as it arrives,
+#     so a rerun skips ids that are already there (resume from checkpoint)
+#
+#   python bulk_extract.py messages.jsonl events.jsonl --concurrency 16 --rpm 500 --tpm 200000
+#   python bulk_extract.py messages.jsonl events.jsonl --parquet events.parquet
+#
+# Offline Batch API mode (50% cheaper, results within 24h):
+#   python bulk_extract.py messages.jsonl batch_requests.jsonl --batch-file
+#   ... upload with purpose="batch", create the batch, download its output file ...
+#   python bulk_extract.py batch_output.jsonl events.jsonl --ingest
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import time
+
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from pydantic import BaseModel, ValidationError
+
+from llm_accounting import instrument_openai
+from llm_router import is_retryable  # 429, 5xx, timeouts and connection errors
+
+MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "Extract the event information."
+MAX_OUTPUT_TOKENS = 200
+MAX_RETRIES = 6
+
+
+class CalendarEvent(BaseModel):
+    name: str
+    date: str
+    participants: list[str]
+
+
+# --- Input / output ---
+def read_inputs(path: str):
+    """Yields (id, text) pairs one at a time, from .jsonl or .csv."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for i, row in enumerate(csv.DictReader(f)):
+                yield str(row.get("id") or i), row["text"]
+        else:
+            for i, line in enumerate(f):
+                if line.strip():
+                    record = json.loads(line)
+                    yield str(record.get("id", i)), record["text"]
+
+
+def completed_ids(path: str) -> set:
+    """Ids already written to the output file by an earlier (possibly interrupted) run."""
+    done = set()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if "error" in record:
+                        continue  # failed last time, try again
+                    # Result files use "id", Batch API request files use "custom_id"
+                    done.add(record["id"] if "id" in record else record["custom_id"])
+                except (json.JSONDecodeError, KeyError):
+                    continue  # half-written last line from a crash
+    return done
+
+
+def latest_records(path: str) -> dict:
+    """Last record per id: a retried id's later result replaces its earlier error row."""
+    records = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    records[record["id"]] = record
+                except (json.JSONDecodeError, KeyError):
+                    continue
+    return records
+
+
+def estimate_tokens(text: str) -> int:
+    return len(SYSTEM_PROMPT + text) // 4 + MAX_OUTPUT_TOKENS
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """Refills `per_minute` units per minute; acquire() waits until enough are available."""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+# --- Online extraction ---
+async def extract_one(client, text, text_format, rpm_bucket, tpm_bucket):
+    for attempt in range(MAX_RETRIES):
+        await rpm_bucket.acquire(1)
+        await tpm_bucket.acquire(estimate_tokens(text))
+        try:
+            response = await client.responses.parse(
+                model=MODEL,
+                input=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": text},
+                ],
+                text_format=text_format,
+                max_output_tokens=MAX_OUTPUT_TOKENS,
+            )
+            return response.output_parsed
+        except Exception as e:
+            if not is_retryable(e) or attempt == MAX_RETRIES - 1:
+                raise
+            # Exponential backoff with full jitter: 0..1s, 0..2s, 0..4s, ...
+            await asyncio.sleep(random.uniform(0, 2 ** attempt))
+
+
+async def run_online(input_path, output_path, text_format=CalendarEvent,
+                     concurrency=16, rpm=500, tpm=200_000):
+    client = instrument_openai(AsyncOpenAI())
+    rpm_bucket, tpm_bucket = TokenBucket(rpm), TokenBucket(tpm)
+    done = completed_ids(output_path)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    start = time.time()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def worker(queue):
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                record_id, text = item
+                try:
+                    parsed = await extract_one(client, text, text_format, rpm_bucket, tpm_bucket)
+                    record = {"id": record_id, "result": parsed.model_dump() if parsed else None}
+                    counts["ok"] += 1
+                except Exception as e:
+                    record = {"id": record_id, "error": f"{type(e).__name__}: {e}"}
+                    counts["failed"] += 1
+                # Single-threaded event loop, so whole-line writes do not interleave
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+
+        # A small queue keeps memory flat no matter how big the input file is
+        queue = asyncio.Queue(maxsize=concurrency * 2)
+        workers = [asyncio.create_task(worker(queue)) for _ in range(concurrency)]
+        for record_id, text in read_inputs(input_path):
+            if record_id in done:
+                counts["skipped"] += 1
+                continue
+            await queue.put((record_id, text))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+
+    elapsed = time.time() - start
+    print(f"Done: {counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} already done "
+          f"in {elapsed:.1f}s ({counts['ok'] / elapsed if elapsed else 0:.1f} msg/s)")
+
+
+def to_parquet(jsonl_path: str, parquet_path: str):
+    import pandas as pd  # needs pyarrow or fastparquet installed
+    df = pd.DataFrame(list(latest_records(jsonl_path).values()))
+    df.to_parquet(parquet_path, index=False)
+    print(f"Wrote {len(df)} rows to {parquet_path}")
+
+
+# --- Offline Batch API mode ---
+def strict_schema(text_format) -> dict:
+    # Structured outputs needs additionalProperties: false; fine for flat models like CalendarEvent
+    schema = text_format.model_json_schema()
+    schema["additionalProperties"] = False
+    return schema
+
+
+def write_batch_file(input_path, batch_path, text_format=CalendarEvent):
+    """Writes one /v1/responses request per input line, in Batch API format."""
+    done = completed_ids(batch_path)
+    count = 0
+    with open(batch_path, "a", encoding="utf-8") as out:
+        for record_id, text in read_inputs(input_path):
+            if record_id in done:
+                continue
+            request = {
+                "custom_id": record_id,
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": {
+                    "model": MODEL,
+                    "input": [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": text},
+                    ],
+                    "max_output_tokens": MAX_OUTPUT_TOKENS,
+                    "text": {"format": {
+                        "type": "json_schema",
+                        "name": text_format.__name__,
+                        "schema": strict_schema(text_format),
+                        "strict": True,
+                    }},
+                },
+            }
+            out.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    print(f"Wrote {count} batch requests to {batch_path}")
+
+
+def ingest_batch_results(results_path, output_path, text_format=CalendarEvent):
+    """Validates a downloaded batch output file and appends results to output_path."""
+    done = completed_ids(output_path)
+    seen = set(latest_records(output_path))  # includes ids that failed before
+    counts = {"ok": 0, "failed": 0}
+    with open(results_path, "r", encoding="utf-8") as f, open(output_path, "a", encoding="utf-8") as out:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            record_id = item["custom_id"]
+            if record_id in done:
+                continue
+            try:
+                if item.get("error"):
+                    raise RuntimeError(item["error"])
+                body = item["response"]["body"]
+                text = "".join(
+                    part["text"]
+                    for output in body.get("output", []) if output.get("type") == "message"
+                    for part in output.get("content", []) if part.get("type") == "output_text"
+                )
+                record = {"id": record_id, "result": text_format.model_validate_json(text).model_dump()}
+                counts["ok"] += 1
+            except (RuntimeError, KeyError, ValidationError) as e:
+                counts["failed"] += 1
+                if record_id in seen:
+                    continue  # already recorded as failed; ingesting the same file twice adds nothing
+                record = {"id": record_id, "error": f"{type(e).__name__}: {e}"}
+            seen.add(record_id)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"Ingested {counts['ok']} results, {counts['failed']} failed")
+
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+
+    parser = argparse.ArgumentParser(description="Bulk CalendarEvent extraction with responses.parse")
+    parser.add_argument("input", help="messages .jsonl/.csv (or a batch output file with --ingest)")
+    parser.add_argument("output", help="results .jsonl (or batch request file with --batch-file)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=500, help="requests per minute")
+    parser.add_argument("--tpm", type=int, default=200_000, help="tokens per minute")
+    parser.add_argument("--parquet", help="also write the results to this .parquet file")
+    parser.add_argument("--batch-file", action="store_true", help="write Batch API requests instead of calling the API")
+    parser.add_argument("--ingest", action="store_true", help="read a Batch API output file")
+    args = parser.parse_args()
+
+    if args.batch_file:
+        write_batch_file(args.input, args.output)
+    elif args.ingest:
+        ingest_batch_results(args.input, args.output)
+    else:
+        asyncio.run(run_online(args.input, args.output, concurrency=args.concurrency,
+                               rpm=args.rpm, tpm=args.tpm))
+    if args.parquet and not args.batch_file:
+        to_parquet(args.output, args.parquet)
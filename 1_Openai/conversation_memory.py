@@ -0,0 +1,102 @@
+# Token-budgeted conversation memory with a rolling summary
+#
+# Chat Completions is stateless, so every call resends the whole message list and
+# long sessions get slower and more expensive with every turn. This keeps:
+#   - the system prompt
+#   - one summary message covering all older turns (updated incrementally)
+#   - the most recent turns verbatim
+# The summary and the recent turns together stay within `budget_tokens`.
+#
+#   memory = ConversationMemory(client, system_prompt="You are a helpful assistant.")
+#   answer = memory.chat("What is the factorial of 7?")
+#   print(memory.last_report)   # tokens sent vs. tokens the full history would have cost
+
+import tiktoken
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the summary below with the new turns. Keep names, numbers, decisions and open "
+    "questions; drop small talk. Reply with the updated summary only.\n\n"
+    "Current summary:\n{summary}\n\nNew turns:\n{turns}"
+)
+
+
+def get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+class ConversationMemory:
+    def __init__(self, client, system_prompt: str, model="gpt-4o-mini",
+                 budget_tokens=2000, summary_model="gpt-4o-mini"):
+        self.client = client
+        self.model = model
+        self.summary_model = summary_model
+        self.budget_tokens = budget_tokens
+        self.encoding = get_encoding(model)
+        self.system = {"role": "system", "content": system_prompt}
+        self.summary = ""
+        self.recent = []          # verbatim messages, oldest first
+        self.full_tokens = self.count(self.system)  # what resending everything would cost
+        self.last_report = None
+
+    def count(self, message) -> int:
+        # ~4 tokens of per-message overhead in the chat format; tool-call turns have no content
+        return len(self.encoding.encode(message["content"] or "")) + 4
+
+    def add(self, role: str, content: str):
+        message = {"role": role, "content": content}
+        self.recent.append(message)
+        self.full_tokens += self.count(message)
+        self._fit_budget()
+
+    def _fit_budget(self):
+        # Always keep the newest message, fold the oldest ones into the summary until
+        #  summary + recent fit. The updated summary can be longer, so check again
+        while True:
+            summary = self._summary_message()
+            used = sum(self.count(m) for m in self.recent) + (self.count(summary) if summary else 0)
+            folded = []
+            while len(self.recent) > 1 and used > self.budget_tokens:
+                message = self.recent.pop(0)
+                used -= self.count(message)
+                folded.append(message)
+            if not folded:
+                return
+            self._update_summary(folded)
+
+    def _update_summary(self, messages):
+        turns = "\n".join(f"{m['role']}: {m['content'] or ''}" for m in messages)
+        response = self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[{"role": "user", "content": SUMMARY_PROMPT.format(
+                summary=self.summary or "(empty)", turns=turns)}],
+            temperature=0,
+        )
+        self.summary = response.choices[0].message.content.strip()
+
+    def _summary_message(self):
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"}
+
+    def messages(self):
+        """The message list to send: system prompt, summary (if any), recent turns."""
+        summary = self._summary_message()
+        return [self.system] + ([summary] if summary else []) + self.recent
+
+    def chat(self, user_message: str, **kwargs) -> str:
+        self.add("user", user_message)
+        messages = self.messages()
+        sent = sum(self.count(m) for m in messages)
+        self.last_report = {
+            "sent_tokens": sent,
+            "full_history_tokens": self.full_tokens,
+            "tokens_saved": max(0, self.full_tokens - sent),
+        }
+        response = self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+        answer = response.choices[0].message.content
+        self.add("assistant", answer)
+        return answer
@@ -0,0 +1,343 @@
+# Token, latency and cost accounting for LLM calls
+#
+# Wraps the clients used across the course so every call is recorded with
+# model, input/output tokens, latency, whether it was a cache hit and a tag
+# saying who made it (script name by default, or an agent / graph node):
+#
+#   client = instrument_openai(OpenAI())          # responses.create/parse, chat.completions.create
+#   model = instrument_gemini(genai.GenerativeModel("gemini-2.5-flash"))
+#   ollama_client = instrument_ollama(ollama.Client())   # or AsyncClient()
+#   bedrock = instrument_bedrock(boto3.client("bedrock-runtime"))
+#   instrument_agents()                            # default client of the OpenAI Agents SDK
+#   llm = ChatOpenAI(..., callbacks=[langchain_callback()])   # LangGraph: tagged "node:<name>"
+#
+#   with tag(f"agent:{agent.name}"):   # everything inside is attributed to this tag
+#       await Runner.run(agent, message)
+#
+# Scripts outside 1_Openai add that folder to sys.path first (like agent_batch.py).
+# CrewAI (LiteLLM) and AutoGen (OpenAIChatCompletionClient) create their own clients
+# internally and are not instrumented.
+#
+# Records are appended to llm_usage.jsonl (LLM_USAGE_LOG, read at the first call so a
+# later load_dotenv() still applies) by a background thread, so the call itself only
+# pays for building a small tuple (well under 1 ms).
+#
+#   python llm_accounting.py            # top consumers and p95 latency by model
+#   python llm_accounting.py --by tag
+
+import argparse
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+
+DEFAULT_USAGE_LOG = "llm_usage.jsonl"
+
+# USD per 1M tokens (input, output); unknown models are counted with cost 0
+PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "amazon.titan-text-lite-v1": (0.15, 0.20),
+}
+
+_default_tag = os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+_current_tag = contextvars.ContextVar("llm_tag", default=_default_tag)
+
+
+class tag:
+    """Context manager / decorator that attributes the calls inside it to `name`."""
+
+    def __init__(self, name):
+        self.name = name
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_tag.set(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        _current_tag.reset(self._token)
+
+    def __call__(self, function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with tag(self.name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with tag(self.name):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+# --- Background writer ---
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def put(self, record):
+        self.queue.put(record)
+
+    def _run(self):
+        while True:
+            time.sleep(0.2)  # batch up records, one file append per interval
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            lines = []
+            while True:
+                try:
+                    lines.append(_to_json(self.queue.get_nowait()))
+                except queue.Empty:
+                    break
+            if lines:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+
+
+_writer = None
+
+
+def _to_json(record):
+    ts, provider, model, tag_name, input_tokens, output_tokens, latency, cache_hit, error = record
+    price_in, price_out = PRICES.get(model, (0.0, 0.0))
+    # A cache hit never reached the API, so it cost nothing
+    cost = 0.0 if cache_hit else (input_tokens * price_in + output_tokens * price_out) / 1e6
+    return json.dumps({
+        "ts": ts, "provider": provider, "model": model, "tag": tag_name,
+        "input_tokens": input_tokens, "output_tokens": output_tokens,
+        "latency_ms": round(latency * 1000, 1), "cache_hit": cache_hit,
+        "cost_usd": round(cost, 8), "error": error,
+    })
+
+
+def record(provider, model, input_tokens, output_tokens, latency, cache_hit=False, error=None, tag_name=None):
+    global _writer
+    if _writer is None:
+        _writer = _Writer(usage_log_path())
+    _writer.put((time.time(), provider, model, tag_name or _current_tag.get(),
+                 input_tokens or 0, output_tokens or 0, latency, cache_hit, error))
+
+
+def _reset_cache_flag():
+    # response_cache.CachedOpenAI sets this flag for calls it served from disk; it is
+    # cleared before every wrapped call so a stale value never carries over
+    response_cache = sys.modules.get("response_cache")
+    if response_cache:
+        response_cache.served_from_cache.set(False)
+
+
+def _was_cache_hit():
+    response_cache = sys.modules.get("response_cache")
+    return bool(response_cache and response_cache.served_from_cache.get())
+
+
+# --- Wrappers ---
+def _wrap(owner, name, provider, extract):
+    """Replaces owner.name with a timed version; extract(kwargs, result) -> (model, in, out)."""
+    original = getattr(owner, name)
+
+    def failed(kwargs, start, e):
+        record(provider, kwargs.get("model") or kwargs.get("modelId"), 0, 0,
+               time.perf_counter() - start, error=type(e).__name__)
+
+    def succeeded(kwargs, start, result):
+        model, input_tokens, output_tokens = extract(kwargs, result)
+        record(provider, model, input_tokens, output_tokens, time.perf_counter() - start, _was_cache_hit())
+
+    # One wrapper for sync and async clients: iscoroutinefunction() is not reliable here,
+    # because the SDKs wrap their async methods in plain (decorator) functions
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        _reset_cache_flag()
+        start = time.perf_counter()
+        try:
+            result = original(*args, **kwargs)
+        except Exception as e:
+            failed(kwargs, start, e)
+            raise
+        if not inspect.isawaitable(result):
+            succeeded(kwargs, start, result)
+            return result
+
+        async def finish():
+            try:
+                value = await result
+            except Exception as e:
+                failed(kwargs, start, e)
+                raise
+            succeeded(kwargs, start, value)
+            return value
+        return finish()
+    setattr(owner, name, wrapper)
+
+
+def _openai_usage(kwargs, response):
+    # Streams have no usage yet; they are recorded with 0 tokens and time-to-stream-open
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return kwargs.get("model"), 0, 0
+    if hasattr(usage, "input_tokens"):  # Responses API
+        return kwargs.get("model"), usage.input_tokens, usage.output_tokens
+    return kwargs.get("model"), usage.prompt_tokens, usage.completion_tokens
+
+
+def instrument_openai(client):
+    """OpenAI / AsyncOpenAI / CachedOpenAI: responses.create, responses.parse, chat.completions.create."""
+    _wrap(client.responses, "create", "openai", _openai_usage)
+    _wrap(client.responses, "parse", "openai", _openai_usage)
+    _wrap(client.chat.completions, "create", "openai", _openai_usage)
+    return client
+
+
+def instrument_gemini(model):
+    """google.generativeai GenerativeModel.generate_content."""
+    model_name = model.model_name.removeprefix("models/")
+
+    def extract(kwargs, response):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return model_name, 0, 0
+        return model_name, usage.prompt_token_count, usage.candidates_token_count
+    _wrap(model, "generate_content", "gemini", extract)
+    return model
+
+
+def instrument_ollama(client):
+    """ollama.Client / ollama.AsyncClient generate and chat."""
+    def extract(kwargs, response):
+        if not hasattr(response, "get"):
+            # stream=True returns a generator; counts are only in its last chunk
+            return kwargs.get("model"), 0, 0
+        return kwargs.get("model"), response.get("prompt_eval_count"), response.get("eval_count")
+    _wrap(client, "generate", "ollama", extract)
+    _wrap(client, "chat", "ollama", extract)
+    return client
+
+
+def instrument_bedrock(client):
+    """boto3 bedrock-runtime invoke_model; token counts come from the response headers."""
+    def extract(kwargs, response):
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        return (
+            kwargs.get("modelId"),
+            int(headers.get("x-amzn-bedrock-input-token-count", 0)),
+            int(headers.get("x-amzn-bedrock-output-token-count", 0)),
+        )
+    _wrap(client, "invoke_model", "bedrock", extract)
+    # Streamed replies carry their counts in the last chunk only; recorded with 0 tokens
+    _wrap(client, "invoke_model_with_response_stream", "bedrock", extract)
+    return client
+
+
+def instrument_agents(client=None):
+    """Makes an instrumented AsyncOpenAI the default client of the OpenAI Agents SDK."""
+    from agents import set_default_openai_client
+    from openai import AsyncOpenAI
+    client = instrument_openai(client or AsyncOpenAI())
+    set_default_openai_client(client)
+    return client
+
+
+def langchain_callback():
+    """
+    LangChain callback handler (ChatOpenAI, ChatGoogleGenerativeAI, ChatAnthropic, ...).
+    Calls made inside a LangGraph node are tagged "node:<name>".
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageCallback(BaseCallbackHandler):
+        def __init__(self):
+            self.started = {}  # run_id -> (start, provider, model, tag)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+            metadata = metadata or {}
+            node = metadata.get("langgraph_node")
+            self.started[run_id] = (time.perf_counter(), metadata.get("ls_provider", "langchain"),
+                                    metadata.get("ls_model_name"), f"node:{node}" if node else None)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            if run_id not in self.started:
+                return
+            start, provider, model, tag_name = self.started.pop(run_id)
+            input_tokens = output_tokens = 0
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+            model = model or (response.llm_output or {}).get("model_name")
+            record(provider, model, input_tokens, output_tokens, time.perf_counter() - start, tag_name=tag_name)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            if run_id not in self.started:
+                return
+            start, provider, model, tag_name = self.started.pop(run_id)
+            record(provider, model, 0, 0, time.perf_counter() - start,
+                   error=type(error).__name__, tag_name=tag_name)
+
+    return UsageCallback()
+
+
+# --- Summary CLI ---
+def usage_log_path():
+    return os.getenv("LLM_USAGE_LOG", DEFAULT_USAGE_LOG)
+
+
+def load_records(path=None):
+    with open(path or usage_log_path(), "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def summarize(path=None, by="tag", top=10):
+    groups = defaultdict(lambda: {"calls": 0, "input": 0, "output": 0, "cost": 0.0, "hits": 0, "errors": 0, "latencies": []})
+    for r in load_records(path):
+        g = groups[r.get(by) or "-"]
+        g["calls"] += 1
+        g["input"] += r["input_tokens"]
+        g["output"] += r["output_tokens"]
+        g["cost"] += r["cost_usd"]
+        g["hits"] += bool(r["cache_hit"])
+        g["errors"] += bool(r["error"])
+        g["latencies"].append(r["latency_ms"])
+
+    print(f"{by:32}{'calls':>7}{'in tok':>10}{'out tok':>10}{'cost $':>10}{'hits':>6}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}")
+    ranked = sorted(groups.items(), key=lambda kv: (kv[1]["cost"], kv[1]["input"] + kv[1]["output"]), reverse=True)
+    for key, g in ranked[:top]:
+        ordered = sorted(g["latencies"])
+        p50 = ordered[int(0.50 * (len(ordered) - 1))]
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        print(f"{str(key)[:31]:32}{g['calls']:7}{g['input']:10}{g['output']:10}{g['cost']:10.4f}"
+              f"{g['hits']:6}{g['errors']:6}{p50:9.0f}{p95:9.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize llm_usage.jsonl")
+    parser.add_argument("--by", default="tag", choices=["tag", "model", "provider"])
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--path", default=None, help="default: LLM_USAGE_LOG or llm_usage.jsonl")
+    args = parser.parse_args()
+    print("Top consumers:\n")
+    summarize(args.path, args.by, args.top)
+    if args.by != "model":
+        print("\nBy model:\n")
+        summarize(args.path, "model", args.top)
@@ -0,0 +1,216 @@
+# Latency-aware router over OpenAI-compatible chat backends
+#
+# OpenAI, Gemini and Ollama all speak the Chat Completions API:
+#   - OpenAI:  https://api.openai.com/v1
+#   - Gemini:  https://generativelanguage.googleapis.com/v1beta/openai/  (GOOGLE_API_KEY)
+#   - Ollama:  http://localhost:11434/v1
+# so one OpenAI client per backend is enough. The router keeps a rolling window of
+# latencies and errors per backend and sends each request to the fastest healthy one.
+#
+#   router = LLMRouter(default_backends(), hedge_after=2.0)
+#   response, backend = router.chat([{"role": "user", "content": "Hi"}])
+#
+# - Failover: if a backend fails, the next best one is tried
+# - Circuit breaker: a backend with repeated failures (or a high error rate) is skipped
+#   for a cool-down period, then gets one probe request; success closes the circuit
+#   and clears its error history, failure opens it again
+# - Only retryable errors (429, 5xx, timeouts, connection errors) count as failures and
+#   fail over; anything else (e.g. a 400 for a bad request) is raised straight away
+# - Hedging (optional): if the first backend has not answered after `hedge_after`
+#   seconds, the same request goes to the next backend and the first reply wins
+#
+# Any OpenAI-compatible fake server works as a backend, which is how this is tested locally.
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import openai
+from openai import OpenAI
+
+from llm_accounting import instrument_openai
+
+WINDOW = 100              # calls remembered per backend
+MAX_ERROR_RATE = 0.5      # above this the circuit opens
+MIN_CALLS = 10            # calls needed before the error rate is trusted
+FAILURES_TO_TRIP = 3      # consecutive failures that open the circuit
+COOLDOWN_SECONDS = 30     # how long a tripped backend is skipped
+
+
+class Backend:
+    def __init__(self, name, model, base_url=None, api_key=None, timeout=60):
+        self.name = name
+        self.model = model
+        self.client = instrument_openai(OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0))
+        self.latencies = deque(maxlen=WINDOW)
+        self.outcomes = deque(maxlen=WINDOW)  # True = success
+        self.consecutive_failures = 0
+        self.open_until = 0.0  # 0 = circuit closed
+        self.probing = False   # half-open: one probe request in flight
+        self.lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self.lock:
+            self.probing = False
+            if ok:
+                self.latencies.append(latency)
+                self.consecutive_failures = 0
+                if self.open_until:
+                    # Probe succeeded: close the circuit and forget the old failures
+                    self.open_until = 0.0
+                    self.outcomes.clear()
+                self.outcomes.append(True)
+                return
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            failed = self.outcomes.count(False)
+            if (self.open_until  # failed probe
+                    or self.consecutive_failures >= FAILURES_TO_TRIP
+                    or (len(self.outcomes) >= MIN_CALLS and failed / len(self.outcomes) > MAX_ERROR_RATE)):
+                self.open_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def percentile(self, p):
+        with self.lock:
+            if not self.latencies:
+                return 0.0  # untried backends sort first so they get measured
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    @property
+    def error_rate(self):
+        with self.lock:
+            return 1 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self):
+        """Closed circuit, or cool-down over and no probe in flight yet."""
+        with self.lock:
+            if not self.open_until:
+                return True
+            return time.monotonic() >= self.open_until and not self.probing
+
+    def call(self, messages, **kwargs):
+        with self.lock:
+            if self.open_until and time.monotonic() >= self.open_until:
+                self.probing = True
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+        except Exception as e:
+            if is_retryable(e):
+                self.record(time.perf_counter() - start, False)
+            else:
+                # The request itself is bad; that says nothing about the backend
+                with self.lock:
+                    self.probing = False
+            raise
+        self.record(time.perf_counter() - start, True)
+        return response
+
+
+def is_retryable(error):
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def default_backends():
+    """OpenAI, Gemini and local Ollama, skipping cloud backends without an API key."""
+    backends = []
+    if os.getenv("OPENAI_API_KEY"):
+        backends.append(Backend("openai", "gpt-4o-mini"))
+    if os.getenv("GOOGLE_API_KEY"):
+        backends.append(Backend(
+            "gemini", "gemini-2.5-flash",
+            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            api_key=os.getenv("GOOGLE_API_KEY"),
+        ))
+    backends.append(Backend(
+        "ollama", "llama3.2:latest",
+        base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"), api_key="ollama",
+    ))
+    return backends
+
+
+class LLMRouter:
+    def __init__(self, backends, hedge_after=None):
+        self.backends = backends
+        self.hedge_after = hedge_after
+        self.pool = ThreadPoolExecutor(max_workers=max(2, len(backends) * 4))
+
+    def ranked(self):
+        """Healthy backends fastest first (by p95), then unhealthy ones as a last resort."""
+        healthy = [b for b in self.backends if b.healthy]
+        unhealthy = [b for b in self.backends if not b.healthy]
+        return sorted(healthy, key=lambda b: b.percentile(0.95)) + unhealthy
+
+    def chat(self, messages, **kwargs):
+        """Returns (response, backend_name) from the first backend that answers."""
+        candidates = self.ranked()
+        errors = []
+        if self.hedge_after is None:
+            for backend in candidates:
+                try:
+                    return backend.call(messages, **kwargs), backend.name
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    errors.append(f"{backend.name}: {e}")
+            raise RuntimeError("All backends failed: " + "; ".join(errors))
+
+        # Hedged: start the best backend, add the next one each time hedge_after passes
+        # (or immediately when a request fails). The slower request is left to finish
+        # in the background; its latency still feeds the stats.
+        pending = {}
+        remaining = list(candidates)
+        while remaining or pending:
+            if remaining and (not pending or len(pending) < 2):
+                backend = remaining.pop(0)
+                pending[self.pool.submit(backend.call, messages, **kwargs)] = backend
+            done, _ = wait(pending, timeout=self.hedge_after if remaining else None,
+                           return_when=FIRST_COMPLETED)
+            if not done and remaining:
+                backend = remaining.pop(0)
+                pending[self.pool.submit(backend.call, messages, **kwargs)] = backend
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    return future.result(), backend.name
+                except Exception as e:
+                    if not is_retryable(e):
+                        raise
+                    errors.append(f"{backend.name}: {e}")
+        raise RuntimeError("All backends failed: " + "; ".join(errors))
+
+    def stats(self):
+        return [
+            {
+                "backend": b.name,
+                "calls": len(b.outcomes),
+                "p50": b.percentile(0.50),
+                "p95": b.percentile(0.95),
+                "error_rate": b.error_rate,
+                "healthy": b.healthy,
+            }
+            for b in self.backends
+        ]
+
+    def print_stats(self):
+        print(f"{'backend':10}{'calls':>6}{'p50':>8}{'p95':>8}{'errors':>8}  healthy")
+        for s in self.stats():
+            print(f"{s['backend']:10}{s['calls']:6}{s['p50']:7.2f}s{s['p95']:7.2f}s"
+                  f"{s['error_rate']:8.0%}  {s['healthy']}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    router = LLMRouter(default_backends(), hedge_after=3.0)
+    for _ in range(5):
+        response, backend = router.chat([{"role": "user", "content": "What is the factorial of 7?"}])
+        print(f"[{backend}] {response.choices[0].message.content[:80]}")
+    router.print_stats()
@@ -0,0 +1,345 @@
+# Offline mock of the OpenAI API for benchmarks and CI
+#
+# Speaks just enough of the API for the 1_Openai scripts:
+#   POST /v1/chat/completions   (plain and stream=True)
+#   POST /v1/responses          (plain, stream=True, and responses.parse via text.format)
+#   GET  /v1/models
+#   POST/GET/DELETE /v1/files[/{id}]                      (kept in memory per server)
+#   POST/GET/DELETE /v1/vector_stores[/{id}], POST /v1/vector_stores/{id}/files
+#
+# Latency, token rate and errors are configurable, so client-side overhead and
+# concurrency behaviour can be measured without API keys:
+#
+#   python mock_openai_server.py --port 8000 --latency-ms 300 --jitter 0.5 --tokens-per-sec 80 --error-rate 0.02
+#
+# then point any script at it:
+#   OPENAI_BASE_URL=http://127.0.0.1:8000/v1 OPENAI_API_KEY=mock python 1_2_openai_responses_short_story.py
+#
+# Only the standard library is used.
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_TEXT = (
+    "Once upon a time a curious AI agent wanted to learn singing. It practised scales every night, "
+    "listened to old records and finally sang a duet with its users. Everyone agreed it was off key "
+    "but full of heart."
+)
+
+
+class MockConfig:
+    def __init__(self, latency_ms=200.0, jitter=0.3, tokens_per_sec=100.0, error_rate=0.0, output_tokens=60):
+        self.latency_ms = latency_ms          # median time to first byte
+        self.jitter = jitter                  # sigma of the lognormal latency distribution
+        self.tokens_per_sec = tokens_per_sec  # streaming / generation speed
+        self.error_rate = error_rate          # fraction of requests answered with 429 or 500
+        self.output_tokens = output_tokens    # words in each reply
+
+    def first_byte_delay(self):
+        if self.latency_ms <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.latency_ms / 1000), self.jitter) if self.jitter else self.latency_ms / 1000
+
+
+def _words(n):
+    words = MOCK_TEXT.split()
+    return [words[i % len(words)] + " " for i in range(n)]
+
+
+def _fake_from_schema(schema, defs=None):
+    """Builds a value that satisfies a (simple) JSON schema, for responses.parse."""
+    defs = defs or schema.get("$defs", {})
+    if "$ref" in schema:
+        return _fake_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        return _fake_from_schema(schema["anyOf"][0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        return {k: _fake_from_schema(v, defs) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_fake_from_schema(schema.get("items", {}), defs)]
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    return "mock"
+
+
+def _count_input_tokens(body):
+    return max(1, len(json.dumps(body.get("messages") or body.get("input") or "")) // 4)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection reuse can be measured
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        pass  # quiet
+
+    # --- plumbing ---
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_sse(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _sse(self, data, event=None):
+        text = (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+        chunk = text.encode("utf-8")
+        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        self.wfile.flush()
+
+    def _end_sse(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _inject_error(self):
+        if random.random() < self.config.error_rate:
+            status = random.choice([429, 500])
+            self._send_json(status, {"error": {"message": "mock injected error", "type": "mock", "code": status}})
+            return True
+        return False
+
+    # --- routes ---
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "mock"}]})
+        elif match := re.search(r"/files/([^/]+)$", path):
+            self._send_stored(self.server.files, match.group(1))
+        elif match := re.search(r"/vector_stores/([^/]+)$", path):
+            self._send_stored(self.server.vector_stores, match.group(1))
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_DELETE(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if match := re.search(r"/(files|vector_stores)/([^/]+)$", path):
+            kind, object_id = match.groups()
+            stored = getattr(self.server, kind).pop(object_id, None)
+            if stored is None:
+                self._send_json(404, {"error": {"message": f"no such object {object_id}"}})
+                return
+            deleted = "file" if kind == "files" else "vector_store.deleted"
+            self._send_json(200, {"id": object_id, "object": deleted, "deleted": True})
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length)
+        path = self.path.split("?")[0].rstrip("/")
+        is_upload = path.endswith("/files") and "/vector_stores/" not in path
+        body = {} if is_upload else json.loads(data or b"{}")
+        time.sleep(self.config.first_byte_delay())
+        if self._inject_error():
+            return
+        if path.endswith("/chat/completions"):
+            self._chat(body)
+        elif path.endswith("/responses"):
+            self._responses(body)
+        elif is_upload:
+            self._upload_file(data)
+        elif match := re.search(r"/vector_stores/([^/]+)/files$", path):
+            self._add_vector_store_file(match.group(1), body)
+        elif path.endswith("/vector_stores"):
+            self._create_vector_store(body)
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    # --- files and vector stores ---
+    def _send_stored(self, store, object_id):
+        if object_id in store:
+            self._send_json(200, store[object_id])
+        else:
+            self._send_json(404, {"error": {"message": f"no such object {object_id}"}})
+
+    def _upload_file(self, data):
+        # multipart/form-data: a "purpose" field and a "file" part
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8") + data
+        )
+        parts = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+        file_part = parts["file"]
+        stored = {
+            "id": f"file-{uuid.uuid4().hex[:12]}", "object": "file", "created_at": int(time.time()),
+            "bytes": len(file_part.get_payload(decode=True)), "filename": file_part.get_filename() or "upload",
+            "purpose": parts["purpose"].get_content().strip(), "status": "processed",
+        }
+        self.server.files[stored["id"]] = stored
+        self._send_json(200, stored)
+
+    def _create_vector_store(self, body):
+        now = int(time.time())
+        stored = {
+            "id": f"vs_{uuid.uuid4().hex[:12]}", "object": "vector_store", "created_at": now,
+            "name": body.get("name", ""), "status": "completed", "usage_bytes": 0, "last_active_at": now,
+            "metadata": body.get("metadata") or {},
+            "file_counts": {"in_progress": 0, "completed": 0, "failed": 0, "cancelled": 0, "total": 0},
+        }
+        self.server.vector_stores[stored["id"]] = stored
+        self._send_json(200, stored)
+
+    def _add_vector_store_file(self, vector_store_id, body):
+        store = self.server.vector_stores.get(vector_store_id)
+        if store is None or body.get("file_id") not in self.server.files:
+            self._send_json(404, {"error": {"message": "no such vector store or file"}})
+            return
+        for key in ("completed", "total"):
+            store["file_counts"][key] += 1
+        self._send_json(200, {
+            "id": body["file_id"], "object": "vector_store.file", "created_at": int(time.time()),
+            "vector_store_id": vector_store_id, "status": "completed", "usage_bytes": 0, "last_error": None,
+        })
+
+    def _reply_text(self, body):
+        text_format = (body.get("text") or {}).get("format") or {}
+        if text_format.get("type") == "json_schema":
+            return [json.dumps(_fake_from_schema(text_format["schema"]))]
+        return _words(self.config.output_tokens)
+
+    def _chat(self, body):
+        model = body.get("model", "gpt-4o-mini")
+        pieces = _words(self.config.output_tokens)
+        usage = {"prompt_tokens": _count_input_tokens(body), "completion_tokens": len(pieces)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            time.sleep(len(pieces) / self.config.tokens_per_sec)
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop", "logprobs": None,
+                             "message": {"role": "assistant", "content": "".join(pieces).strip()}}],
+                "usage": usage,
+            })
+            return
+
+        self._start_sse()
+        for piece in pieces:
+            time.sleep(1 / self.config.tokens_per_sec)
+            self._sse(json.dumps({
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }))
+        self._sse(json.dumps({
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }))
+        self._sse("[DONE]")
+        self._end_sse()
+
+    def _response_object(self, body, text, status="completed"):
+        output_tokens = max(1, len(text) // 4) if text else 0
+        input_tokens = _count_input_tokens(body)
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:12]}", "object": "response", "created_at": int(time.time()),
+            "status": status, "model": body.get("model", "gpt-4o-mini"),
+            "output": [{
+                "type": "message", "id": f"msg_{uuid.uuid4().hex[:12]}", "status": "completed", "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }] if text else [],
+            "parallel_tool_calls": True, "tool_choice": "auto", "tools": [],
+            "usage": {
+                "input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens_details": {"reasoning_tokens": 0},
+            },
+        }
+
+    def _responses(self, body):
+        pieces = self._reply_text(body)
+        if not body.get("stream"):
+            time.sleep(len(pieces) / self.config.tokens_per_sec)
+            self._send_json(200, self._response_object(body, "".join(pieces).strip()))
+            return
+
+        final = self._response_object(body, "".join(pieces))
+        sequence = 0
+
+        def event(payload):
+            nonlocal sequence
+            payload["sequence_number"] = sequence
+            sequence += 1
+            self._sse(json.dumps(payload), event=payload["type"])
+
+        self._start_sse()
+        event({"type": "response.created", "response": {**final, "status": "in_progress", "output": []}})
+        if not final["output"]:
+            # --output-tokens 0: an empty reply has no message item, so no text events either
+            event({"type": "response.completed", "response": final})
+            self._end_sse()
+            return
+        item_id = final["output"][0]["id"]
+        for piece in pieces:
+            time.sleep(1 / self.config.tokens_per_sec)
+            event({"type": "response.output_text.delta", "item_id": item_id, "output_index": 0,
+                   "content_index": 0, "delta": piece, "logprobs": []})
+        event({"type": "response.output_text.done", "item_id": item_id, "output_index": 0,
+               "content_index": 0, "text": "".join(pieces), "logprobs": []})
+        event({"type": "response.completed", "response": final})
+        self._end_sse()
+
+
+class MockServer(ThreadingHTTPServer):
+    # The default listen backlog (5) drops connections when many clients connect at once
+    request_queue_size = 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.files = {}          # file_id -> file object
+        self.vector_stores = {}  # vector_store_id -> vector store object
+
+
+def start_server(port=0, config=None, host="127.0.0.1"):
+    """Starts the mock in a background thread; returns (server, base_url)."""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config or MockConfig()})
+    server = MockServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock server")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median time to first byte")
+    parser.add_argument("--jitter", type=float, default=0.3, help="lognormal sigma (0 = fixed latency)")
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0)
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.jitter, args.tokens_per_sec, args.error_rate, args.output_tokens)
+    server, base_url = start_server(args.port, config)
+    print(f"Mock OpenAI API on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
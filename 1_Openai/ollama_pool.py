@@ -0,0 +1,133 @@
+# Warm-model pool for local Ollama generation
+#
+# A cold ollama.generate call first loads the model into memory, which can take
+# several seconds. This keeps a configured set of models loaded and runs requests
+# against them in parallel:
+#   - warm_up() pre-loads every model at startup and pins it with keep_alive
+#   - generate() / generate_many() run at most `max_parallel` requests at a time
+#   - generate_batched() packs several short prompts into one request
+#   - stats() reports per-model load time and tokens/sec
+#
+#   pool = OllamaPool(["llama3.2:latest"], keep_alive="30m", max_parallel=4)
+#   asyncio.run(pool.warm_up())
+#
+# For real parallelism the Ollama server must allow it too: set OLLAMA_NUM_PARALLEL
+# (requests per model) and OLLAMA_MAX_LOADED_MODELS before starting `ollama serve`.
+
+import asyncio
+import re
+import time
+from collections import defaultdict
+
+from ollama import AsyncClient
+
+from llm_accounting import instrument_ollama
+
+NS = 1e9  # Ollama reports durations in nanoseconds
+
+
+class ModelStats:
+    def __init__(self):
+        self.load_seconds = None
+        self.requests = 0
+        self.output_tokens = 0
+        self.generate_seconds = 0.0
+
+    @property
+    def tokens_per_sec(self):
+        return self.output_tokens / self.generate_seconds if self.generate_seconds else 0.0
+
+
+class OllamaPool:
+    def __init__(self, models, keep_alive="30m", max_parallel=4, host=None):
+        self.models = list(models)
+        self.keep_alive = keep_alive
+        self.client = instrument_ollama(AsyncClient(host=host))
+        self.semaphore = asyncio.Semaphore(max_parallel)
+        self.model_stats = defaultdict(ModelStats)
+
+    async def warm_up(self):
+        """Loads every configured model; an empty prompt loads without generating."""
+        async def load(model):
+            start = time.perf_counter()
+            response = await self.client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+            load = response.get("load_duration") or 0
+            self.model_stats[model].load_seconds = load / NS if load else time.perf_counter() - start
+        await asyncio.gather(*(load(m) for m in self.models))
+
+    def _record(self, model, response):
+        stats = self.model_stats[model]
+        stats.requests += 1
+        stats.output_tokens += response.get("eval_count") or 0
+        stats.generate_seconds += (response.get("eval_duration") or 0) / NS
+        load = response.get("load_duration") or 0
+        # A load_duration of more than a few ms means the model was cold after all
+        if load > 0.05 * NS and stats.load_seconds is None:
+            stats.load_seconds = load / NS
+
+    async def generate(self, prompt, model=None, **options):
+        model = model or self.models[0]
+        async with self.semaphore:
+            response = await self.client.generate(
+                model=model, prompt=prompt, keep_alive=self.keep_alive, options=options or None
+            )
+        self._record(model, response)
+        return response["response"]
+
+    async def generate_many(self, prompts, model=None, **options):
+        """Runs all prompts concurrently (bounded by max_parallel); results keep input order."""
+        return await asyncio.gather(*(self.generate(p, model, **options) for p in prompts))
+
+    async def generate_batched(self, prompts, model=None, max_batch=8, max_chars=300, **options):
+        """
+        Short prompts are sent together as one numbered request, which saves per-request
+        prompt processing on small models. Long prompts, and any batch whose answer does
+        not split back cleanly, fall back to one request per prompt.
+        """
+        results = [None] * len(prompts)
+        small = [i for i, p in enumerate(prompts) if len(p) <= max_chars]
+        large = [i for i, p in enumerate(prompts) if len(p) > max_chars]
+        batches = [small[i:i + max_batch] for i in range(0, len(small), max_batch)]
+
+        async def run_batch(indexes):
+            if len(indexes) == 1:
+                results[indexes[0]] = await self.generate(prompts[indexes[0]], model, **options)
+                return
+            numbered = "\n".join(f"{n}. {prompts[i]}" for n, i in enumerate(indexes, start=1))
+            answer = await self.generate(
+                "Answer each of the following requests separately. Start each answer with a line "
+                f"'### <number>' and nothing else on that line.\n\n{numbered}",
+                model, **options,
+            )
+            parts = re.split(r"^###\s*(\d+)\s*$", answer, flags=re.MULTILINE)
+            answers = {int(parts[k]): parts[k + 1].strip() for k in range(1, len(parts) - 1, 2)}
+            if sorted(answers) != list(range(1, len(indexes) + 1)):
+                # The model did not follow the format - do them one by one
+                for i, text in zip(indexes, await self.generate_many([prompts[i] for i in indexes], model, **options)):
+                    results[i] = text
+                return
+            for n, i in enumerate(indexes, start=1):
+                results[i] = answers[n]
+
+        async def run_single(i):
+            results[i] = await self.generate(prompts[i], model, **options)
+
+        await asyncio.gather(*(run_batch(b) for b in batches), *(run_single(i) for i in large))
+        return results
+
+    def stats(self):
+        return {
+            model: {
+                "load_seconds": s.load_seconds,
+                "requests": s.requests,
+                "output_tokens": s.output_tokens,
+                "tokens_per_sec": s.tokens_per_sec,
+            }
+            for model, s in self.model_stats.items()
+        }
+
+    def print_stats(self):
+        print(f"{'model':20}{'load':>8}{'requests':>10}{'tokens':>8}{'tok/s':>8}")
+        for model, s in self.stats().items():
+            load = f"{s['load_seconds']:.2f}s" if s["load_seconds"] is not None else "-"
+            print(f"{model:20}{load:>8}{s['requests']:10}{s['output_tokens']:8}{s['tokens_per_sec']:8.1f}")
@@ -0,0 +1,201 @@
+# On-disk response cache for the Responses API
+#
+# Wrap the client once and every client.responses.create / responses.parse call
+# is served from a local SQLite file when the same request was made before:
+#
+#   from response_cache import CachedOpenAI
+#   client = CachedOpenAI(OpenAI())
+#
+# Modes (OPENAI_CACHE_MODE in .env, or mode=...):
+#   "readwrite" - serve hits from disk, call the API on a miss and store it (default)
+#   "replay"    - serve hits only; a miss raises CacheMissError (no network)
+#   "off"       - always call the API
+#
+# OPENAI_CACHE_MODE and OPENAI_CACHE_PATH are read when CachedOpenAI is created,
+# so a .env loaded after this import still applies.
+
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from pydantic import BaseModel
+
+DEFAULT_CACHE_PATH = "responses_cache.db"
+DEFAULT_CACHE_MODE = "readwrite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+# True while the last responses call in this thread/task was served from disk
+# (read by llm_accounting to tag cache hits)
+served_from_cache = contextvars.ContextVar("served_from_cache", default=False)
+
+
+class CacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no cached response."""
+
+
+# --- Request key ---
+def _canonical(value):
+    # Pydantic classes (text_format=CalendarEvent) are keyed by name + JSON schema
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {"__model__": value.__name__, "schema": value.model_json_schema()}
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+def request_key(endpoint: str, kwargs: dict) -> str:
+    """sha256 of the endpoint plus the canonical JSON of the request arguments."""
+    payload = json.dumps(
+        {"endpoint": endpoint, "request": _canonical(kwargs)},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- SQLite store with TTL and size-bounded LRU eviction ---
+class ResponseCache:
+    def __init__(self, path=None, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        path = path or os.getenv("OPENAI_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self.conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            return payload
+
+    def put(self, key, endpoint, payload):
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, payload, size, now, now),
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until we are back under the limit
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_used ASC"
+        ).fetchall():
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self.lock:
+            count, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total}
+
+
+# --- Client wrappers ---
+class CachedResponses:
+    """Drop-in for client.responses with cached create() and parse()."""
+
+    def __init__(self, responses, cache, mode):
+        self._responses = responses
+        self._cache = cache
+        self._mode = mode
+
+    def __getattr__(self, name):
+        return getattr(self._responses, name)
+
+    def create(self, **kwargs):
+        from openai.types.responses import Response
+        return self._cached("responses.create", kwargs, self._responses.create, Response)
+
+    def parse(self, **kwargs):
+        from openai.types.responses import ParsedResponse
+        text_format = kwargs.get("text_format")
+        response_type = ParsedResponse[text_format] if text_format else ParsedResponse
+        return self._cached("responses.parse", kwargs, self._responses.parse, response_type)
+
+    def _cached(self, endpoint, kwargs, call, response_type):
+        # Streams are consumed incrementally by the caller, so they are never cached
+        if self._mode == "off" or kwargs.get("stream"):
+            served_from_cache.set(False)
+            return call(**kwargs)
+
+        key = request_key(endpoint, kwargs)
+        payload = self._cache.get(key)
+        served_from_cache.set(payload is not None)
+        if payload is not None:
+            # Rehydrate into the SDK type, so output_text / output_parsed keep working.
+            # The SDK's construct() builds nested models without validation, so fields
+            # a server left out (None in the stored JSON) do not fail the load
+            return response_type.construct(**json.loads(payload))
+        if self._mode == "replay":
+            raise CacheMissError(f"No cached response for {endpoint} (key {key[:12]})")
+
+        response = call(**kwargs)
+        self._cache.put(key, endpoint, response.model_dump_json())
+        return response
+
+
+class CachedOpenAI:
+    """Wraps an OpenAI() client; everything except responses.* passes straight through."""
+
+    def __init__(self, client, cache=None, mode=None):
+        self._client = client
+        self.cache = cache or ResponseCache()
+        self.mode = mode or os.getenv("OPENAI_CACHE_MODE", DEFAULT_CACHE_MODE)
+        self.responses = CachedResponses(client.responses, self.cache, self.mode)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+if __name__ == "__main__":
+    print(ResponseCache().stats())
@@ -0,0 +1,162 @@
+# Stream consumer with timing metrics for the Responses API
+#
+# Turns the raw event stream from responses.create(stream=True) into text chunks
+# and measures how the stream felt to the user:
+#   - time to first token (TTFT)
+#   - gaps between text deltas (mean / p95 / max)
+#   - output tokens per second and total duration
+#
+#   stream = await client.responses.create(model=..., input=..., stream=True)
+#   consumer = TextStream(stream, model="gpt-4o-mini")
+#   async for chunk in consumer:
+#       print(chunk, end="", flush=True)
+#   MetricsSink().record(consumer.metrics)
+#
+# Works with both OpenAI (sync, use `for`) and AsyncOpenAI (async, use `async for`) streams.
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+METRICS_DB = "stream_metrics.db"
+
+
+@dataclass
+class StreamMetrics:
+    model: str
+    label: str = ""
+    ttft: float | None = None        # seconds until the first text delta
+    duration: float = 0.0            # seconds from request to response.completed
+    chunks: int = 0                  # number of text deltas received
+    output_tokens: int = 0           # from usage when available, else estimated
+    gaps: list[float] = field(default_factory=list)
+
+    @property
+    def tokens_per_sec(self) -> float:
+        # Generation speed after the first token arrived
+        generating = self.duration - (self.ttft or 0.0)
+        return self.output_tokens / generating if generating > 0 else 0.0
+
+    def gap_stats(self):
+        if not self.gaps:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(self.gaps)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        return sum(ordered) / len(ordered), p95, ordered[-1]
+
+    def summary(self) -> str:
+        mean_gap, p95_gap, _ = self.gap_stats()
+        return (
+            f"TTFT {self.ttft or 0:.3f}s, total {self.duration:.2f}s, "
+            f"{self.output_tokens} tokens at {self.tokens_per_sec:.1f} tok/s, "
+            f"gap mean {mean_gap * 1000:.1f}ms p95 {p95_gap * 1000:.1f}ms"
+        )
+
+
+class TextStream:
+    """Iterates over the text deltas of a Responses API stream and records StreamMetrics."""
+
+    def __init__(self, stream, model: str, label: str = "", started_at: float | None = None):
+        self.stream = stream
+        # Pass started_at=time.perf_counter() taken *before* responses.create
+        # to include connection time in TTFT
+        self.started_at = started_at or time.perf_counter()
+        self.metrics = StreamMetrics(model=model, label=label)
+        self.text = ""
+        self._last = None
+
+    def _on_event(self, event):
+        now = time.perf_counter()
+        if event.type == "response.output_text.delta":
+            if self.metrics.ttft is None:
+                self.metrics.ttft = now - self.started_at
+            else:
+                self.metrics.gaps.append(now - self._last)
+            self._last = now
+            self.metrics.chunks += 1
+            self.text += event.delta
+            return event.delta
+        if event.type == "response.completed":
+            usage = getattr(event.response, "usage", None)
+            if usage is not None:
+                self.metrics.output_tokens = usage.output_tokens
+        return None
+
+    def _finish(self):
+        self.metrics.duration = time.perf_counter() - self.started_at
+        if not self.metrics.output_tokens:
+            # No usage event (e.g. stream cut short): ~4 characters per token
+            self.metrics.output_tokens = max(1, len(self.text) // 4) if self.text else 0
+
+    def __iter__(self):
+        try:
+            for event in self.stream:
+                delta = self._on_event(event)
+                if delta:
+                    yield delta
+        finally:
+            self._finish()
+
+    async def __aiter__(self):
+        try:
+            async for event in self.stream:
+                delta = self._on_event(event)
+                if delta:
+                    yield delta
+        finally:
+            self._finish()
+
+
+class MetricsSink:
+    """Appends StreamMetrics rows to a local SQLite file for later comparison."""
+
+    def __init__(self, path=METRICS_DB):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS stream_metrics (
+            timestamp TEXT,
+            model TEXT,
+            label TEXT,
+            ttft_s REAL,
+            duration_s REAL,
+            chunks INTEGER,
+            output_tokens INTEGER,
+            tokens_per_sec REAL,
+            gap_mean_ms REAL,
+            gap_p95_ms REAL,
+            gap_max_ms REAL
+        )
+        """)
+        self.conn.commit()
+
+    def record(self, metrics: StreamMetrics):
+        mean_gap, p95_gap, max_gap = metrics.gap_stats()
+        self.conn.execute(
+            "INSERT INTO stream_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), metrics.model, metrics.label,
+                metrics.ttft, metrics.duration, metrics.chunks, metrics.output_tokens,
+                metrics.tokens_per_sec, mean_gap * 1000, p95_gap * 1000, max_gap * 1000,
+            ),
+        )
+        self.conn.commit()
+
+    def report(self):
+        """Average TTFT and throughput per model/label."""
+        return self.conn.execute("""
+        SELECT model, label, COUNT(*), AVG(ttft_s), AVG(tokens_per_sec), AVG(gap_p95_ms)
+        FROM stream_metrics GROUP BY model, label ORDER BY model, label
+        """).fetchall()
+
+
+def _fmt(value, spec, unit=""):
+    # AVG() is NULL when no run of the group produced any text (e.g. all cancelled)
+    return "-" if value is None else f"{value:{spec}}{unit}"
+
+
+if __name__ == "__main__":
+    print(f"{'model':16}{'label':12}{'runs':>6}{'ttft':>8}{'tok/s':>8}{'gap p95':>10}")
+    for model, label, runs, ttft, tps, gap in MetricsSink().report():
+        print(f"{model:16}{label:12}{runs:6}{_fmt(ttft, '.3f', 's'):>8}{_fmt(tps, '.1f'):>8}"
+              f"{_fmt(gap, '.1f', 'ms'):>10}")
@@ -0,0 +1,64 @@
+# python -m pytest 1_Openai/test_llm_router.py
+
+import pytest
+
+from llm_router import FAILURES_TO_TRIP, Backend, LLMRouter
+from mock_openai_server import MockConfig, start_server
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+@pytest.fixture(autouse=True)
+def usage_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_USAGE_LOG", str(tmp_path / "llm_usage.jsonl"))
+
+
+@pytest.fixture
+def backend():
+    """Returns a factory for backends served by their own mock server."""
+    servers = []
+
+    def make(name, **config):
+        server, base_url = start_server(0, MockConfig(jitter=0, tokens_per_sec=1e6, output_tokens=5, **config))
+        servers.append(server)
+        return Backend(name, "gpt-4o-mini", base_url=base_url, api_key="mock")
+
+    yield make
+    for server in servers:
+        server.shutdown()
+
+
+def test_fails_over_to_the_next_backend(backend):
+    broken, working = backend("broken", latency_ms=0, error_rate=1.0), backend("working", latency_ms=0)
+    router = LLMRouter([broken, working])
+
+    _, name = router.chat(MESSAGES)
+    assert name == "working"
+    assert list(broken.outcomes) == [False]
+
+
+def test_circuit_opens_after_repeated_failures(backend):
+    broken, working = backend("broken", latency_ms=0, error_rate=1.0), backend("working", latency_ms=0)
+    router = LLMRouter([broken, working])
+
+    for _ in range(FAILURES_TO_TRIP):
+        router.chat(MESSAGES)
+    assert not broken.healthy
+
+    _, name = router.chat(MESSAGES)
+    assert name == "working"
+    assert len(broken.outcomes) == FAILURES_TO_TRIP  # skipped while the circuit is open
+
+
+def test_all_backends_failing_raises(backend):
+    router = LLMRouter([backend("a", latency_ms=0, error_rate=1.0), backend("b", latency_ms=0, error_rate=1.0)])
+    with pytest.raises(RuntimeError, match="All backends failed"):
+        router.chat(MESSAGES)
+
+
+def test_hedged_request_returns_the_faster_backend(backend):
+    slow, fast = backend("slow", latency_ms=1000), backend("fast", latency_ms=0)
+    router = LLMRouter([slow, fast], hedge_after=0.05)
+
+    _, name = router.chat(MESSAGES)
+    assert name == "fast"
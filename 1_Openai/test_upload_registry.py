@@ -0,0 +1,62 @@
+# python -m pytest 1_Openai/test_upload_registry.py
+
+import pytest
+from openai import OpenAI
+
+from mock_openai_server import MockConfig, start_server
+from upload_registry import UploadRegistry
+
+
+@pytest.fixture
+def server():
+    server, base_url = start_server(0, MockConfig(latency_ms=0, jitter=0))
+    server.client = OpenAI(base_url=base_url, api_key="mock")
+    yield server
+    server.shutdown()
+
+
+def test_reupload_of_same_content_is_skipped(server, tmp_path):
+    registry = UploadRegistry(server.client, path=str(tmp_path / "registry.db"))
+    doc = tmp_path / "faqs.txt"
+    doc.write_text("Shipping takes 3-5 days.")
+
+    first = registry.upload(str(doc))
+    assert registry.upload(str(doc)) == first
+    assert list(server.files) == [first]
+
+
+def test_changed_content_is_uploaded_and_old_file_collected(server, tmp_path):
+    registry = UploadRegistry(server.client, path=str(tmp_path / "registry.db"))
+    doc = tmp_path / "faqs.txt"
+    doc.write_text("Shipping takes 3-5 days.")
+    old = registry.upload(str(doc))
+    doc.write_text("Shipping takes 2 days.")
+    new = registry.upload(str(doc))
+
+    assert new != old
+    assert registry.collect_garbage() == {"files": [old], "vector_stores": []}
+    assert list(server.files) == [new]
+
+
+def test_file_deleted_on_server_is_uploaded_again(server, tmp_path):
+    registry = UploadRegistry(server.client, path=str(tmp_path / "registry.db"))
+    doc = tmp_path / "faqs.txt"
+    doc.write_text("Shipping takes 3-5 days.")
+    first = registry.upload(str(doc))
+    server.client.files.delete(first)
+
+    second = registry.upload(str(doc))
+    assert second != first
+    assert list(server.files) == [second]
+
+
+def test_vector_store_is_reused_for_the_same_files(server, tmp_path):
+    registry = UploadRegistry(server.client, path=str(tmp_path / "registry.db"))
+    doc = tmp_path / "faqs.txt"
+    doc.write_text("Shipping takes 3-5 days.")
+    file_id = registry.upload(str(doc))
+
+    store_id = registry.vector_store("faqs_store", [file_id])
+    assert registry.vector_store("faqs_store", [file_id]) == store_id
+    assert list(server.vector_stores) == [store_id]
+    assert server.vector_stores[store_id]["file_counts"]["total"] == 1
@@ -0,0 +1,179 @@
+# Local registry of files uploaded to the OpenAI Files API
+#
+# Maps the sha256 of a file's content to the file_id it was uploaded as, so
+# re-running a script reuses the upload instead of sending the same bytes again.
+# Vector stores are registered the same way, by name and the set of file_ids in them.
+#
+#   registry = UploadRegistry(client)
+#   file_id = registry.upload("animals.pdf", purpose="user_data")
+#   store_id = registry.vector_store("faqs_store", [file_id])
+#   registry.collect_garbage()   # delete uploads that were replaced by newer content
+#
+# The registry only needs an OpenAI-compatible client, so it can be exercised against
+# a local stub server with OpenAI(base_url="http://localhost:8000/v1", api_key="test").
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+import openai
+
+DEFAULT_REGISTRY_PATH = "uploads_registry.db"
+
+
+def file_sha256(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class UploadRegistry:
+    def __init__(self, client, path=None, verify=True):
+        # OPENAI_UPLOAD_REGISTRY is read here, not at import, so a later load_dotenv() applies
+        path = path or os.getenv("OPENAI_UPLOAD_REGISTRY", DEFAULT_REGISTRY_PATH)
+        self.client = client
+        # verify=True checks with the API that a registered id still exists before reusing it
+        self.verify = verify
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            sha256 TEXT NOT NULL,
+            purpose TEXT NOT NULL,
+            file_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            bytes INTEGER NOT NULL,
+            uploaded_at TEXT NOT NULL,
+            superseded INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (sha256, purpose)
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS vector_stores (
+            vector_store_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            files_key TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            superseded INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        self.conn.commit()
+
+    # --- Files ---
+    def upload(self, path: str, purpose: str = "user_data") -> str:
+        """Returns a file_id for this content, uploading only if it is not registered yet."""
+        digest = file_sha256(path)
+        row = self.conn.execute(
+            "SELECT file_id FROM files WHERE sha256 = ? AND purpose = ?", (digest, purpose)
+        ).fetchone()
+        if row and self._file_exists(row[0]):
+            self.conn.execute(
+                "UPDATE files SET superseded = 0 WHERE sha256 = ? AND purpose = ?", (digest, purpose)
+            )
+            self.conn.commit()
+            return row[0]
+
+        with open(path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose=purpose)
+
+        # Any older upload of the same path (different content) is now an orphan
+        self.conn.execute(
+            "UPDATE files SET superseded = 1 WHERE path = ? AND purpose = ? AND sha256 != ?",
+            (os.path.abspath(path), purpose, digest),
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (sha256, purpose, file_id, path, bytes, uploaded_at, superseded) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (digest, purpose, uploaded.id, os.path.abspath(path), os.path.getsize(path), _now()),
+        )
+        self.conn.commit()
+        return uploaded.id
+
+    def _file_exists(self, file_id: str) -> bool:
+        if not self.verify:
+            return True
+        try:
+            self.client.files.retrieve(file_id)
+            return True
+        except openai.NotFoundError:
+            # Deleted on the server (or expired) - forget it and upload again.
+            # Other errors (network, auth, 5xx) propagate so a live id is not dropped
+            self.conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+            self.conn.commit()
+            return False
+
+    # --- Vector stores ---
+    def vector_store(self, name: str, file_ids: list[str]) -> str:
+        """Returns a vector store named `name` holding exactly `file_ids`, creating it if needed."""
+        files_key = hashlib.sha256(",".join(sorted(file_ids)).encode("utf-8")).hexdigest()
+        row = self.conn.execute(
+            "SELECT vector_store_id FROM vector_stores WHERE name = ? AND files_key = ? AND superseded = 0",
+            (name, files_key),
+        ).fetchone()
+        if row and self._vector_store_exists(row[0]):
+            return row[0]
+
+        store = self.client.vector_stores.create(name=name)
+        for file_id in file_ids:
+            self.client.vector_stores.files.create(vector_store_id=store.id, file_id=file_id)
+
+        self.conn.execute(
+            "UPDATE vector_stores SET superseded = 1 WHERE name = ? AND files_key != ?", (name, files_key)
+        )
+        self.conn.execute(
+            "INSERT INTO vector_stores (vector_store_id, name, files_key, created_at) VALUES (?, ?, ?, ?)",
+            (store.id, name, files_key, _now()),
+        )
+        self.conn.commit()
+        return store.id
+
+    def _vector_store_exists(self, vector_store_id: str) -> bool:
+        if not self.verify:
+            return True
+        try:
+            self.client.vector_stores.retrieve(vector_store_id)
+            return True
+        except openai.NotFoundError:
+            self.conn.execute("DELETE FROM vector_stores WHERE vector_store_id = ?", (vector_store_id,))
+            self.conn.commit()
+            return False
+
+    # --- Garbage collection ---
+    def collect_garbage(self, dry_run: bool = False) -> dict:
+        """Deletes superseded uploads and vector stores on the server and in the registry."""
+        files = [r[0] for r in self.conn.execute("SELECT file_id FROM files WHERE superseded = 1")]
+        stores = [r[0] for r in self.conn.execute(
+            "SELECT vector_store_id FROM vector_stores WHERE superseded = 1"
+        )]
+        if not dry_run:
+            for store_id in stores:
+                try:
+                    self.client.vector_stores.delete(store_id)
+                except Exception as e:
+                    print(f"Could not delete vector store {store_id}: {e}")
+                self.conn.execute("DELETE FROM vector_stores WHERE vector_store_id = ?", (store_id,))
+            for file_id in files:
+                try:
+                    self.client.files.delete(file_id)
+                except Exception as e:
+                    print(f"Could not delete file {file_id}: {e}")
+                self.conn.execute("DELETE FROM files WHERE file_id = ?", (file_id,))
+            self.conn.commit()
+        return {"files": files, "vector_stores": stores}
+
+
+if __name__ == "__main__":
+    import sys
+    from openai import OpenAI
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    registry = UploadRegistry(OpenAI())
+    removed = registry.collect_garbage(dry_run="--dry-run" in sys.argv)
+    print(f"Orphaned files: {len(removed['files'])}, vector stores: {len(removed['vector_stores'])}")
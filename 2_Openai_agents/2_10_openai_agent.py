@@ -1,106 +1,107 @@
-import pandas as pd
-from collections import OrderedDict
-import sqlite3
 from dotenv import load_dotenv
 from openai import OpenAI
 from agents import Agent, Runner, function_tool
 import asyncio
+import time
+from sentence_transformers import SentenceTransformer
+from short_term_memory import ShortTermMemory, HIT, NEGATIVE
+from faq_store import FAQStore, connect, ensure_schema, sync_csv
+from semantic_cache import SemanticCache
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 load_dotenv(override=True)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
 
 # ---------- Config ----------
 DB_PATH = "conversations.db"
 CSV_PATH = "c:\\code\\agenticai\\2_openai_agents\\Conversation.csv"
+STM_SNAPSHOT_PATH = "short_term_memory.json.gz"
+STM_SNAPSHOT_INTERVAL = 300  # seconds
 MODEL = "gpt-4o-mini"
-client = OpenAI()
-
-# ---------- LRU Short-Term Memory ----------
-class LRUCache:
-    def __init__(self, max_size=500):
-        # OrderedDict is a dictionary that remembers the order of insertion
-        # Helps implement LRU
-        self.cache = OrderedDict()
-        self.max_size = max_size
-
-    def get(self, key): # get the value for a key
-        # print("In get function ", key)
-        if key in self.cache:
-            self.cache.move_to_end(key) # move the key to the end, since it was recently used
-            return self.cache[key]
-        return None
-
-    def put(self, key, value):
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        self.cache[key] = value
-        if len(self.cache) > self.max_size:
-            self.cache.popitem(last=False) # remove the least recently used item
-            
-    def contains(self, key): # check if the key is in the cache
-        return key in self.cache
-
-short_term_memory = LRUCache(max_size=500)
+client = instrument_openai(OpenAI())
+
+# ---------- Short-Term Memory ----------
+# Bounded by entries and bytes, with TTLs, negative caching for questions we
+#  cannot answer, hit/miss counters and a lock for concurrent access.
+# "slru" keeps frequently asked FAQs from being flushed by one-off questions
+#  (see short_term_memory.py; "tinylfu" is stricter still)
+short_term_memory = ShortTermMemory(
+    max_entries=500,
+    max_bytes=2_000_000,
+    ttl=24 * 3600,        # answers are refreshed at least daily
+    negative_ttl=300,     # "cannot help" is remembered for 5 minutes
+    policy="slru",
+)
+
+# ---------- Long-Term Memory ----------
+# A few open connections shared by all tool calls, and an FTS5 (BM25) index so
+#  paraphrased questions still find the right FAQ (see faq_store.py)
+faq_store = FAQStore(DB_PATH, pool_size=4)
+FAQ_TOP_K = 3
+
+# ---------- Semantic Cache ----------
+# Serves a stored answer when an earlier question meant the same thing
+#  ("reset password how" ~ "How do I reset my password?"), skipping Runner.run.
+#  Cleared automatically whenever the FAQ table changes (see semantic_cache.py)
+embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+semantic_cache = SemanticCache(
+    lambda texts: embedding_model.encode(texts, normalize_embeddings=True),
+    threshold=0.88,       # raise if unrelated questions get each other's answers
+    ttl=24 * 3600,
+    max_entries=5000,
+)
 
 # ---------- DB Setup ----------
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS faqs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        topic TEXT NOT NULL UNIQUE,
-        answer TEXT NOT NULL
-    )
-    """)
-    conn.commit()
+    conn = connect(DB_PATH)
+    ensure_schema(conn)
     conn.close()
 
 def load_csv_into_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM faqs")
-    rec_count = cursor.fetchone()[0]
-    if rec_count > 0:
-        print("Number of records in DB: ", rec_count)
-        conn.close()
-        return
-
-    df = pd.read_csv(CSV_PATH)
-    print("Loading CSV into DB and preloading short-term memory...")
-
-    for i, (_, row) in enumerate(df.iterrows()):
-        topic = row["question"].strip()
-        answer = row["answer"].strip()
-
-        # Insert into long-term DB
-        try:
-            cursor.execute(
-                "INSERT INTO faqs (topic, answer) VALUES (?, ?)",
-                (topic, answer)
-            )
-        except sqlite3.IntegrityError:
-            continue
-
-        # Preload short-term memory with first 500 entries
-        if i < 500:
-            short_term_memory.put(topic, answer)
-
-    conn.commit()
+    # Streams the CSV in chunks and upserts only new or changed rows in one
+    #  transaction; an unchanged CSV is skipped entirely (see faq_store.py)
+    print("Syncing CSV into DB...")
+    stats = sync_csv(DB_PATH, CSV_PATH)
+    if stats["rows"]:
+        print(f"Read {stats['rows']} rows, wrote {stats['written']} in {stats['seconds']:.2f}s "
+              f"({stats['rows_per_sec']:,.0f} rows/sec).")
+    else:
+        print("CSV unchanged since last sync.")
+    return stats
+
+def warm_short_term_memory(faqs_changed):
+    # Restore what the agent learned before the last restart, hottest entries first.
+    #  A changed FAQ table may have made those answers stale, so they are dropped then
+    if not faqs_changed:
+        restored = short_term_memory.restore(STM_SNAPSHOT_PATH)
+        if restored:
+            print(f"Restored {restored} entries into short-term memory from {STM_SNAPSHOT_PATH}.")
+            return
+
+    # First start (or FAQs changed): preload the first 500 entries
+    conn = connect(DB_PATH)
+    rows = conn.execute("SELECT topic, answer FROM faqs ORDER BY id LIMIT 500").fetchall()
     conn.close()
-    print(f"Loaded {len(df)} entries into long-term memory.")
-    print(f"Preloaded {min(len(df), 500)} entries into short-term memory.")
+    for topic, answer in rows:
+        short_term_memory.put(topic, answer)
+    print(f"Preloaded {len(rows)} entries into short-term memory.")
 
 
 # ---------- FunctionTool for DB ----------
 @function_tool
 def query_faq_db(topic: str) -> str:
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     # print ("in query_faq_db ", topic)
-    cursor.execute("SELECT answer FROM faqs WHERE topic = ?", (topic,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else "Sorry, I cannot help you."
+    matches = faq_store.search(topic, k=FAQ_TOP_K)
+    if not matches:
+        return "Sorry, I cannot help you."
+    # Best match first, with its relevance score so the agent can judge the fit
+    return "\n\n".join(
+        f"[score {score:.2f}] Q: {question}\nA: {answer}" for question, answer, score in matches
+    )
 
 # ---------- FunctionTool for Short-Term Memory ----------
 @function_tool
@@ -116,6 +117,8 @@ agent = Agent(
     instructions=(
         "You are a customer service agent. "
         "You can only answer using short-term or long-term memory via the provided tools. "
+        "query_faq_db returns the closest FAQ entries, best match first; answer with the "
+        "entry whose question means the same as the user's, and ignore unrelated ones. "
         "If the answer is not found, respond exactly with: 'Sorry, I cannot help you.'"
     )
 )
@@ -127,37 +130,58 @@ async def get_agent_response(user_query: str) -> str:
     user_query = user_query.strip()
     # print(user_query)
 
-    # Check short-term memory first
-    if short_term_memory.get(user_query):
+    # Check short-term memory first (a single lookup)
+    status, cached = short_term_memory.lookup(user_query)
+    if status == HIT:
         # print("Found in STM")
-        return f"(short-term memory) {short_term_memory.get(user_query)}"
-
-    # Add empty placeholder
-    if not short_term_memory.contains(user_query):
-        # print("Not found in STM")
-        short_term_memory.put(user_query, "")
+        return f"(short-term memory) {cached}"
+    if status == NEGATIVE:
+        # Asked recently and the agent could not answer - skip the LLM round trip
+        return "(short-term memory) Sorry, I cannot help you."
+
+    # Then a question with the same meaning (embedding is CPU work - keep it off the loop)
+    semantic_cache.check_version(faq_store.data_version())
+    similar = await asyncio.to_thread(semantic_cache.lookup, user_query)
+    if similar:
+        answer, similarity, _ = similar
+        short_term_memory.put(user_query, answer)
+        return f"(semantic cache {similarity:.2f}) {answer}"
 
     # Run agent
-    response = await Runner.run(agent, user_query)
+    start = time.perf_counter()
+    with tag(f"agent:{agent.name}"):
+        response = await Runner.run(agent, user_query)
     answer = response.final_output.strip()
+    llm_seconds = time.perf_counter() - start
     
     # print("Answer:", answer)
 
-    # Update short-term memory if an actual answer is returned
+    # Real answers and "cannot help" are cached separately, so the
+    #  latter never evicts the former
     if answer != "Sorry, I cannot help you.":
         short_term_memory.put(user_query, answer)
+        await asyncio.to_thread(semantic_cache.put, user_query, answer, llm_seconds)
+    else:
+        short_term_memory.put_negative(user_query)
 
     return f"(AI) {answer}"
 
 # ---------- Run ----------
 async def main():
     init_db()
-    load_csv_into_db()
+    stats = load_csv_into_db()
+    warm_short_term_memory(faqs_changed=stats["written"] > 0)
+    # Snapshots are written from a background thread; the chat loop never waits on them
+    short_term_memory.start_snapshots(STM_SNAPSHOT_PATH, STM_SNAPSHOT_INTERVAL)
     print("Agent Ready! Short + Long Term Memory. Type 'exit' to quit.\n")
 
     while True:
         user_input = input("You: ")
         if user_input.lower() in ["exit", "quit"]:
+            print("Short-term memory:", short_term_memory.stats())
+            print("Semantic cache:", semantic_cache.stats())
+            short_term_memory.save(STM_SNAPSHOT_PATH)
+            faq_store.close()
             break
         answer = await get_agent_response(user_input)
         print("Bot:", answer)
@@ -1,7 +1,13 @@
 from dotenv import load_dotenv
 from agents import Agent, Runner
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, tag  # noqa: E402
 
 load_dotenv(override=True)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
 
 instruction = "You are a helpful customer support analyst."
 message = ("Analyze this customer feedback and suggest improvements to the product: "
@@ -18,5 +24,6 @@ agent = Agent(
 # Takes the user's input (message) and sends it to the LLM
 #  Internally, it will call the Chat Completions/Responses API
 # Gets back a response from the LLM as result, which is a Session object
-result = Runner.run_sync(agent, message)
+with tag(f"agent:{agent.name}"):
+    result = Runner.run_sync(agent, message)
 print(result.final_output)
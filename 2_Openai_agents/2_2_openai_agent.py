@@ -2,9 +2,15 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import asyncio
 from agents import Agent, Runner, function_tool
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 load_dotenv(override=True)
-client = OpenAI()
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
+client = instrument_openai(OpenAI())
 
 # --- Knowledge base ---
 knowledge_base = {
@@ -42,7 +48,8 @@ faq_agent = Agent(
 
 # --- Chat function ---
 async def chat_with_support(message):
-    session = await Runner.run(faq_agent, message)
+    with tag(f"agent:{faq_agent.name}"):
+        session = await Runner.run(faq_agent, message)
     return session.final_output
 
 # --- Loop ---
@@ -1,14 +1,23 @@
 from dotenv import load_dotenv
 import os
-import numpy as np
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
 from agents import Agent, Runner, function_tool
 import asyncio
+from similarity_index import SimilarityIndex
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 # --- Setup ---
 load_dotenv(override=True)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
+client = instrument_openai(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+# --- Tool mode ---
+TOOL_MODE = os.getenv("TOOL_MODE", "generate")  # or TOOL_MODE=retrieve, see bench_tool_modes.py
+TOP_K = 3
 
 # --- Embedding model & knowledge base ---
 embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
@@ -22,34 +31,30 @@ knowledge_base = {
 }
 
 # --- Precompute embeddings ---
-embeddings_index = {
-    topic: embedding_model.encode(answer)
-    for topic, answer in knowledge_base.items()
-}
+faq_index = SimilarityIndex(
+    knowledge_base.keys(), embedding_model.encode(list(knowledge_base.values()))
+)
 print("Embeddings ready!")
 
 
-# --- Cosine similarity helper ---
-def cosine_similarity(vec1, vec2):
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
-
-
 # --- FAQ Tool ---
 @function_tool
 async def get_faq_answer(topic: str) -> str:
     """
-    Finds the most relevant FAQ answer using sentence embeddings,
-    then refines the response using OpenAI generation.
+    Finds the most relevant FAQ answers using sentence embeddings
+    (in "generate" mode the best one is refined using OpenAI generation).
     """
     # Encode user query
     query_embedding = embedding_model.encode(topic)
 
-    # Find the best matching topic
-    best_topic, best_score = None, -1
-    for t, emb in embeddings_index.items():
-        score = cosine_similarity(query_embedding, emb)
-        if score > best_score:
-            best_topic, best_score = t, score
+    # Find the best matching topics (one matrix-vector product over all FAQs)
+    matches = faq_index.search(query_embedding, k=TOP_K)
+    if TOOL_MODE == "retrieve":
+        if not matches:
+            return "No matching FAQ found."
+        return "\n".join(f"[score {score:.2f}] {knowledge_base[t]}" for t, score in matches)
+
+    best_topic, best_score = (matches or [(None, -1)])[0]
 
     # If a match is found, generate an answer using OpenAI
     if best_topic:
@@ -69,16 +74,23 @@ async def get_faq_answer(topic: str) -> str:
 
 
 # --- Agent ---
+RETRIEVE_INSTRUCTIONS = (
+    " The tool returns the closest FAQ entries with similarity scores:"
+    " answer from the entry that fits the question, in your own words."
+)
+
 faq_agent = Agent(
     name="Customer Support Bot",
-    instructions="You are a helpful assistant who answers customer FAQs using your tool.",
+    instructions="You are a helpful assistant who answers customer FAQs using your tool."
+    + (RETRIEVE_INSTRUCTIONS if TOOL_MODE == "retrieve" else ""),
     tools=[get_faq_answer],
 )
 
 
 # --- Chat handler ---
 async def chat_with_support(message):
-    session = await Runner.run(faq_agent, message)
+    with tag(f"agent:{faq_agent.name}"):
+        session = await Runner.run(faq_agent, message)
     return session.final_output
 
 
@@ -1,27 +1,31 @@
 from openai import OpenAI
 from dotenv import load_dotenv
+import os
+import sys
 
+# upload_registry.py lives in 1_Openai, next to the Files API examples
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from upload_registry import UploadRegistry
+from llm_accounting import instrument_openai
 
 load_dotenv(override=True)
-client = OpenAI()
-
-# --- Step 1: Create a vector store ---
-vector_store = client.vector_stores.create(name="faqs_store")
-print(f"Vector store created: {vector_store.id}")
-
-# --- Step 2: Upload your local faq.txt file ---
-faq_file = client.files.create(
-    file=open("c:\\code\\agenticai\\2_openai_agents\\faq.txt", "rb"),
-    purpose="assistants"
-)
-
-# Attach the uploaded file to the vector store
-client.vector_stores.files.create(
-    vector_store_id=vector_store.id,
-    file_id=faq_file.id
-)
+client = instrument_openai(OpenAI())
+
+# --- Step 1: Upload your local faq.txt file ---
+# The upload registry remembers content hash -> file_id, so faq.txt is only
+#  uploaded again when it changes (and the old copy is cleaned up by collect_garbage)
+registry = UploadRegistry(client)
+faq_file_id = registry.upload("c:\\code\\agenticai\\2_openai_agents\\faq.txt", purpose="assistants")
+
+# --- Step 2: Create a vector store holding the file ---
+# Reused as long as it holds the same file; a new one replaces it otherwise
+vector_store_id = registry.vector_store("faqs_store", [faq_file_id])
+print(f"Vector store ready: {vector_store_id}")
 print("faq.txt uploaded into vector store.")
 
+# Delete uploads and vector stores replaced by newer versions of faq.txt
+registry.collect_garbage()
+
 # --- Step 3: Ask a question ---
 response = client.responses.create(
     model="gpt-4o-mini",
@@ -1,15 +1,25 @@
 from dotenv import load_dotenv
 import os
 import sqlite3
-import numpy as np
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
 from agents import Agent, Runner, function_tool
 import asyncio
+from similarity_index import SimilarityIndex
+from embedding_store import EmbeddingStore
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 # --- Setup ---
 load_dotenv(override=True)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
+client = instrument_openai(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+# --- Tool mode ---
+TOOL_MODE = os.getenv("TOOL_MODE", "generate")  # or TOOL_MODE=retrieve, see bench_tool_modes.py
+TOP_K = 3
 
 # --- Database connection ---
 DB_PATH = r"c:\code\agenticai\faqs.db"
@@ -23,36 +33,40 @@ def load_faqs():
 knowledge_base = load_faqs()
 
 # --- Embeddings ---
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-print("Computing embeddings for FAQ knowledge base...")
-embeddings_index = {
-    topic: embedding_model.encode(answer)
-    for topic, answer in knowledge_base.items()
-}
-print(f"Loaded {len(embeddings_index)} FAQs. Embeddings ready!")
-
-
-# --- Cosine similarity ---
-def cosine_similarity(vec1, vec2):
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+
+# Vectors are kept in faqs.db, keyed by model and answer hash: only new or
+#  changed answers are encoded, everything else is read back from disk
+print("Loading embeddings for FAQ knowledge base...")
+embedding_store = EmbeddingStore(DB_PATH, EMBEDDING_MODEL)
+faq_index = SimilarityIndex(
+    knowledge_base.keys(), embedding_store.embed(knowledge_base.values(), embedding_model.encode)
+)
+stats = embedding_store.last_stats
+# Vectors of answers that were edited or removed are not needed any more
+pruned = embedding_store.prune(knowledge_base.values())
+print(f"Loaded {len(faq_index)} FAQs ({stats['encoded']} encoded, {stats['cached']} from cache, "
+      f"{pruned} stale removed) in {stats['seconds']:.2f}s. Embeddings ready!")
 
 
 # --- FAQ Tool ---
 @function_tool
 async def get_faq_answer(topic: str) -> str:
     """
-    Find the most relevant FAQ answer using embeddings stored in SQLite,
-    then generate a clear and natural response using OpenAI.
+    Find the most relevant FAQ answers using embeddings stored in SQLite
+    (in "generate" mode a clear and natural response is written using OpenAI).
     """
     query_embedding = embedding_model.encode(topic)
 
-    # Find the best matching topic
-    best_topic, best_score = None, -1
-    for t, emb in embeddings_index.items():
-        score = cosine_similarity(query_embedding, emb)
-        if score > best_score:
-            best_topic, best_score = t, score
+    # Find the best matching topics (one matrix-vector product over all FAQs)
+    matches = faq_index.search(query_embedding, k=TOP_K)
+    if TOOL_MODE == "retrieve":
+        if not matches:
+            return "No matching FAQ found."
+        return "\n".join(f"[score {score:.2f}] {knowledge_base[t]}" for t, score in matches)
+
+    best_topic, best_score = (matches or [(None, -1)])[0]
 
     # Generate answer using OpenAI if a match is found
     if best_topic:
@@ -72,16 +86,23 @@ async def get_faq_answer(topic: str) -> str:
 
 
 # --- Agent ---
+RETRIEVE_INSTRUCTIONS = (
+    " The tool returns the closest FAQ entries with similarity scores:"
+    " answer from the entry that fits the question, in your own words."
+)
+
 faq_agent = Agent(
     name="Customer Support Bot",
-    instructions="You are a friendly support assistant. Use your FAQ tool to help users.",
+    instructions="You are a friendly support assistant. Use your FAQ tool to help users."
+    + (RETRIEVE_INSTRUCTIONS if TOOL_MODE == "retrieve" else ""),
     tools=[get_faq_answer],
 )
 
 
 # --- Chat function ---
 async def chat_with_support(message):
-    session = await Runner.run(faq_agent, message)
+    with tag(f"agent:{faq_agent.name}"):
+        session = await Runner.run(faq_agent, message)
     return session.final_output
 
 
@@ -1,16 +1,27 @@
 from dotenv import load_dotenv
 import os
 import sqlite3
-import numpy as np
 import gradio as gr
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
 from agents import Agent, Runner, function_tool
 import asyncio
+from similarity_index import SimilarityIndex
+from embedding_store import EmbeddingStore
+from embedding_executor import EmbeddingExecutor
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 # --- Setup ---
 load_dotenv(override=True)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
+client = instrument_openai(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+# --- Tool mode ---
+TOOL_MODE = os.getenv("TOOL_MODE", "generate")  # or TOOL_MODE=retrieve, see bench_tool_modes.py
+TOP_K = 3
 
 # --- Database ---
 DB_PATH = "faqs.db"
@@ -24,36 +35,44 @@ def load_faqs():
 knowledge_base = load_faqs()
 
 # --- Embeddings ---
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-print("Computing embeddings for FAQ knowledge base...")
-embeddings_index = {
-    topic: embedding_model.encode(answer)
-    for topic, answer in knowledge_base.items()
-}
-print(f"Loaded {len(embeddings_index)} FAQs. Embeddings ready!")
-
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+
+# Vectors are kept in faqs.db, keyed by model and answer hash: only new or
+#  changed answers are encoded, everything else is read back from disk
+print("Loading embeddings for FAQ knowledge base...")
+embedding_store = EmbeddingStore(DB_PATH, EMBEDDING_MODEL)
+faq_index = SimilarityIndex(
+    knowledge_base.keys(), embedding_store.embed(knowledge_base.values(), embedding_model.encode)
+)
+stats = embedding_store.last_stats
+# Vectors of answers that were edited or removed are not needed any more
+pruned = embedding_store.prune(knowledge_base.values())
+print(f"Loaded {len(faq_index)} FAQs ({stats['encoded']} encoded, {stats['cached']} from cache, "
+      f"{pruned} stale removed) in {stats['seconds']:.2f}s. Embeddings ready!")
 
-# --- Cosine similarity ---
-def cosine_similarity(vec1, vec2):
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+# Query embeddings run off the event loop, and questions from concurrent chat
+#  sessions that arrive within a few ms are encoded together in one batch
+embedding_executor = EmbeddingExecutor(embedding_model.encode, max_batch=64, max_wait_ms=5)
 
 
 # --- FAQ Tool ---
 @function_tool
 async def get_faq_answer(topic: str) -> str:
     """
-    Retrieves the most relevant FAQ answer using embeddings,
-    and generates a concise reply using OpenAI.
+    Retrieves the most relevant FAQ answers using embeddings
+    (in "generate" mode a concise reply is written using OpenAI).
     """
-    query_embedding = embedding_model.encode(topic)
+    query_embedding = await embedding_executor.embed(topic)
+
+    # Find the most relevant FAQs (one matrix-vector product over all FAQs)
+    matches = faq_index.search(query_embedding, k=TOP_K)
+    if TOOL_MODE == "retrieve":
+        if not matches:
+            return "No matching FAQ found."
+        return "\n".join(f"[score {score:.2f}] {knowledge_base[t]}" for t, score in matches)
 
-    # Find the most relevant FAQ
-    best_topic, best_score = None, -1
-    for t, emb in embeddings_index.items():
-        score = cosine_similarity(query_embedding, emb)
-        if score > best_score:
-            best_topic, best_score = t, score
+    best_topic, best_score = (matches or [(None, -1)])[0]
 
     # Generate response with OpenAI
     if best_topic:
@@ -73,16 +92,23 @@ async def get_faq_answer(topic: str) -> str:
 
 
 # --- Agent ---
+RETRIEVE_INSTRUCTIONS = (
+    " The tool returns the closest FAQ entries with similarity scores:"
+    " answer from the entry that fits the question, in your own words."
+)
+
 faq_agent = Agent(
     name="Customer Support Bot",
-    instructions="You are a friendly support assistant. Use your FAQ tool to answer user questions.",
+    instructions="You are a friendly support assistant. Use your FAQ tool to answer user questions."
+    + (RETRIEVE_INSTRUCTIONS if TOOL_MODE == "retrieve" else ""),
     tools=[get_faq_answer],
 )
 
 
 # --- Async chat handler for Gradio ---
 async def chat_with_support(message, chat_history):
-    session = await Runner.run(faq_agent, message)
+    with tag(f"agent:{faq_agent.name}"):
+        session = await Runner.run(faq_agent, message)
     chat_history = chat_history or []
     chat_history.append((message, session.final_output))
     return chat_history, chat_history
@@ -94,11 +120,14 @@ with gr.Blocks() as demo:
     chatbot = gr.Chatbot()
     msg = gr.Textbox(placeholder="Ask a question about our products or policies...")
     clear = gr.Button("Clear")
+    stats_button = gr.Button("Embedding stats")
+    stats_view = gr.JSON(label="Batch sizes and event-loop lag")
 
     async def respond(user_message, chat_history):
         return await chat_with_support(user_message, chat_history)
 
     msg.submit(respond, [msg, chatbot], [chatbot, chatbot])
     clear.click(lambda: [], None, chatbot)
+    stats_button.click(embedding_executor.stats, None, stats_view)
 
 demo.launch()
@@ -1,60 +1,79 @@
 import os
-import numpy as np
-import gradio as gr
-from pypdf import PdfReader
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 from openai import OpenAI
 from agents import Agent, Runner, function_tool
 import asyncio
+from similarity_index import SimilarityIndex
+from pdf_ingest import load_or_build_index
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, instrument_openai, tag  # noqa: E402
 
 # --- Load environment ---
 load_dotenv(override=True)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# --- Load PDF ---
-PDF_PATH = "c://code//agenticai//2_openai_agents//new_india_assurance.pdf"
-reader = PdfReader(PDF_PATH)
-pdf_text = "".join([page.extract_text() or "" for page in reader.pages])
-
-# --- Split PDF text into chunks ---
-def split_text(text, chunk_size=500):
-    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
-
-pdf_chunks = split_text(pdf_text)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
+client = instrument_openai(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
 
-# --- Embeddings setup ---
-embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-print(f"Embedding {len(pdf_chunks)} chunks from the PDF...")
+# --- Tool mode ---
+TOOL_MODE = os.getenv("TOOL_MODE", "generate")  # or TOOL_MODE=retrieve, see bench_tool_modes.py
+TOP_K = 3
 
-chunk_embeddings = [
-    {"text": chunk, "embedding": embedding_model.encode(chunk)}
-    for chunk in pdf_chunks
-]
-print("✅ Embeddings ready!")
-
-# --- Cosine similarity ---
-def cosine_similarity(vec1, vec2):
-    vec1, vec2 = np.array(vec1), np.array(vec2)
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+# --- PDF + embeddings settings ---
+PDF_PATH = "c://code//agenticai//2_openai_agents//new_india_assurance.pdf"
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHUNK_SIZE = 500      # characters, split on sentence boundaries
+CHUNK_OVERLAP = 100   # characters of whole sentences repeated from the previous chunk
+BATCH_SIZE = 64       # chunks per encode() batch
+ENCODE_WORKERS = 0    # > 1 spreads encoding over processes (large document sets)
+
+# Both are created under __main__ / on first use: encode workers re-import this file,
+#  so nothing heavy (gradio, the embedding model) happens at import time
+embedding_model = None
+chunk_index = None    # built in main (see pdf_ingest.py)
+
+
+def get_embedding_model():
+    global embedding_model
+    if embedding_model is None:
+        from sentence_transformers import SentenceTransformer
+        embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+    return embedding_model
+
+
+def build_chunk_index():
+    # Chunked, batch-encoded and saved to .rag_index/ on the first run;
+    #  later runs load the saved index instantly
+    global chunk_index
+    chunks, vectors, stats = load_or_build_index(
+        PDF_PATH, EMBEDDING_MODEL, CHUNK_SIZE, CHUNK_OVERLAP,
+        batch_size=BATCH_SIZE, workers=ENCODE_WORKERS, model=get_embedding_model(),
+    )
+    chunk_index = SimilarityIndex(chunks, vectors)
+    if stats["cached"]:
+        print(f"✅ Loaded {stats['chunks']} chunks from disk in {stats['seconds']:.2f}s")
+    else:
+        print(f"✅ Embedded {stats['chunks']} chunks in {stats['seconds']:.2f}s "
+              f"({stats['chunks_per_sec']:.1f} chunks/sec)")
 
 
 # --- Define Tool ---
 @function_tool
 async def get_pdf_answer(topic: str) -> str:
     """
-    Answers questions by retrieving relevant information from the PDF using embeddings,
-    and generating a concise response using OpenAI.
+    Answers questions by retrieving relevant information from the PDF using embeddings
+    (in "generate" mode a concise response is written using OpenAI).
     """
-    query_embedding = embedding_model.encode(topic)
+    query_embedding = get_embedding_model().encode(topic)
+
+    # Find the most relevant chunks (one matrix-vector product over all chunks)
+    matches = chunk_index.search(query_embedding, k=TOP_K)
+    if TOOL_MODE == "retrieve":
+        if not matches:
+            return "No matching passage found in the policy document."
+        return "\n\n".join(f"[score {score:.2f}] {chunk}" for chunk, score in matches)
 
-    # Find the most relevant chunk
-    best_chunk, best_score = None, -1
-    for chunk in chunk_embeddings:
-        score = cosine_similarity(query_embedding, chunk["embedding"])
-        if score > best_score:
-            best_score = score
-            best_chunk = chunk["text"]
+    best_chunk, best_score = (matches or [(None, -1)])[0]
 
     # Generate final answer using OpenAI
     if best_chunk:
@@ -81,6 +100,12 @@ rag_agent = Agent(
     instructions=(
         "You are a helpful customer support assistant. "
         "Answer questions using the PDF content through your RAG tool."
+        + (
+            " The tool returns the most relevant policy passages with similarity scores."
+            " Answer concisely and accurately from them, and do not answer questions that"
+            " are not related to insurance policies."
+            if TOOL_MODE == "retrieve" else ""
+        )
     ),
     tools=[get_pdf_answer]
 )
@@ -88,24 +113,32 @@ rag_agent = Agent(
 
 # --- Async chat handler ---
 async def chat_with_rag(message, chat_history):
-    session = await Runner.run(rag_agent, message)
+    with tag(f"agent:{rag_agent.name}"):
+        session = await Runner.run(rag_agent, message)
     chat_history = chat_history or []
     chat_history.append((message, session.final_output))
     return chat_history, chat_history
 
 
 # --- Gradio UI ---
-with gr.Blocks() as demo:
-    gr.Markdown("# 📄 Customer Support RAG Bot (PDF + Hugging Face + GPT-4o-mini)")
+def build_demo():
+    import gradio as gr  # imported here so encode workers never load it
+
+    with gr.Blocks() as demo:
+        gr.Markdown("# 📄 Customer Support RAG Bot (PDF + Hugging Face + GPT-4o-mini)")
 
-    chatbot = gr.Chatbot()
-    msg = gr.Textbox(placeholder="Ask a question about New India Assurance policies...")
-    clear = gr.Button("Clear")
+        chatbot = gr.Chatbot()
+        msg = gr.Textbox(placeholder="Ask a question about New India Assurance policies...")
+        clear = gr.Button("Clear")
 
-    async def respond(user_message, chat_history):
-        return await chat_with_rag(user_message, chat_history)
+        async def respond(user_message, chat_history):
+            return await chat_with_rag(user_message, chat_history)
 
-    msg.submit(respond, [msg, chatbot], [chatbot, chatbot])
-    clear.click(lambda: [], None, chatbot)
+        msg.submit(respond, [msg, chatbot], [chatbot, chatbot])
+        clear.click(lambda: [], None, chatbot)
+    return demo
 
-demo.launch()
+# The index build may start process pools, which re-import this file
+if __name__ == "__main__":
+    build_chunk_index()
+    build_demo().launch()
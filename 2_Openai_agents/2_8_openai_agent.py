@@ -3,8 +3,14 @@
 import time
 from agents import Agent, Runner
 from dotenv import load_dotenv
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, tag  # noqa: E402
 
 load_dotenv(override=True)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
 
 # Define two agents with different instructions
 upi_agent = Agent(
@@ -22,12 +28,14 @@ start = time.time()
 # Run them sequentially (synchronous execution)
 print("Running Cross Border Payments Essay agent...")
 t1 = time.time()
-result1 = Runner.run_sync(upi_agent, "Write the essay now.")
+with tag(f"agent:{upi_agent.name}"):
+    result1 = Runner.run_sync(upi_agent, "Write the essay now.")
 print(f"Cross Border Payments Essay completed in {time.time() - t1:.2f} seconds\n")
 
 print("Running Agent API Note agent...")
 t2 = time.time()
-result2 = Runner.run_sync(agent_api_agent, "Write the note now.")
+with tag(f"agent:{agent_api_agent.name}"):
+    result2 = Runner.run_sync(agent_api_agent, "Write the note now.")
 print(f"Agent API Note completed in {time.time() - t2:.2f} seconds\n")
 
 print("=== Essay on Cross Border Payments ===\n")
@@ -3,8 +3,14 @@ import time
 import asyncio
 from agents import Agent, Runner
 from dotenv import load_dotenv
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, tag  # noqa: E402
 
 load_dotenv(override=True)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
 
 # Define two agents with different instructions
 upi_agent = Agent(
@@ -17,6 +23,11 @@ agent_api_agent = Agent(
     instructions="Write a detailed one-page note explaining the OpenAI Agents API: what it is, how it works, and its use cases."
 )
 
+async def run_tagged(agent, message):
+    # gather() runs each coroutine in its own task, so the tag is set inside it
+    with tag(f"agent:{agent.name}"):
+        return await Runner.run(agent, message)
+
 async def main():
     start = time.time()
 
@@ -24,8 +35,8 @@ async def main():
 
     # Run both agents concurrently
     t1 = time.time()
-    task1 = Runner.run(upi_agent, "Write the essay now.")
-    task2 = Runner.run(agent_api_agent, "Write the note now.")
+    task1 = run_tagged(upi_agent, "Write the essay now.")
+    task2 = run_tagged(agent_api_agent, "Write the note now.")
 
     result1, result2 = await asyncio.gather(task1, task2)
 
@@ -0,0 +1,187 @@
+# Batch runner for OpenAI Agents
+#
+# 2_8 runs two agents one after the other and 2_9 gathers exactly two. This runs
+# any number of (agent, input) jobs through Runner.run:
+#   - at most `concurrency` jobs in flight
+#   - token buckets for requests/min and tokens/min (tokens are estimated up front,
+#     then corrected with the real usage once a job finishes)
+#   - 429 / 5xx / connection errors and per-job timeouts are retried with
+#     exponential backoff and jitter
+#   - each result is appended to a JSONL file as soon as it finishes; a rerun with the
+#     same job order skips the ids already written
+#   - a progress line every few seconds with throughput and p50/p95/p99 latency
+#
+#   runner = AgentBatchRunner(concurrency=16, rpm=500, tpm=200_000, timeout=120)
+#   summary = asyncio.run(runner.run([(essay_agent, "Write about UPI"), ...], "results.jsonl"))
+#
+#   python agent_batch.py --jobs 200 --concurrency 16 --output batch_results.jsonl
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from agents import Agent, Runner
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from bulk_extract import TokenBucket, completed_ids, is_retryable  # noqa: E402
+from llm_accounting import instrument_agents, tag  # noqa: E402
+
+EXPECTED_OUTPUT_TOKENS = 800  # per job, for the tokens/min estimate
+
+
+def estimate_tokens(agent, job_input):
+    instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+    return len(instructions + str(job_input)) // 4 + EXPECTED_OUTPUT_TOKENS
+
+
+def _serializable(output):
+    # Agents with an output_type return pydantic models
+    return output.model_dump() if hasattr(output, "model_dump") else output
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+class AgentBatchRunner:
+    def __init__(self, concurrency=16, rpm=500, tpm=200_000, timeout=120.0,
+                 max_retries=6, progress_every=5.0):
+        self.concurrency = concurrency
+        self.rpm_bucket, self.tpm_bucket = TokenBucket(rpm), TokenBucket(tpm)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.progress_every = progress_every
+        self.latencies = []
+        self.counts = {"ok": 0, "failed": 0, "skipped": 0, "retries": 0, "tokens": 0}
+
+    async def run_job(self, agent, job_input):
+        """One job with rate limiting, timeout and retries; returns (result, attempts)."""
+        estimate = estimate_tokens(agent, job_input)
+        for attempt in range(1, self.max_retries + 1):
+            # Each model call inside a run (tool loops) is one request; one per job is the estimate
+            await self.rpm_bucket.acquire(1)
+            await self.tpm_bucket.acquire(estimate)
+            try:
+                with tag(f"agent:{agent.name}"):
+                    result = await asyncio.wait_for(Runner.run(agent, job_input), self.timeout)
+            except Exception as e:
+                retryable = isinstance(e, asyncio.TimeoutError) or is_retryable(e)
+                if not retryable or attempt == self.max_retries:
+                    raise
+                self.counts["retries"] += 1
+                # Exponential backoff with full jitter: 0..1s, 0..2s, 0..4s, ...
+                await asyncio.sleep(random.uniform(0, 2 ** (attempt - 1)))
+                continue
+            used = result.context_wrapper.usage.total_tokens
+            self.counts["tokens"] += used
+            if used > estimate:
+                await self.tpm_bucket.acquire(used - estimate)  # pay back the underestimate
+            return result, attempt
+
+    def _progress(self, start):
+        elapsed = time.monotonic() - start
+        ordered = sorted(self.latencies)
+        done = self.counts["ok"] + self.counts["failed"]
+        return (f"{done} done ({self.counts['failed']} failed, {self.counts['retries']} retries) | "
+                f"{done / elapsed if elapsed else 0:.2f} jobs/s, "
+                f"{self.counts['tokens'] / elapsed * 60 if elapsed else 0:,.0f} tok/min | "
+                f"p50 {percentile(ordered, 0.50):.1f}s p95 {percentile(ordered, 0.95):.1f}s "
+                f"p99 {percentile(ordered, 0.99):.1f}s")
+
+    async def run(self, jobs, output_path):
+        """
+        Runs an iterable of (agent, input) pairs; job i gets id i. Results stream to
+        output_path as JSONL. Returns the summary counts.
+        """
+        done = completed_ids(output_path)
+        start = time.monotonic()
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            async def worker(queue):
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    job_id, agent, job_input = item
+                    job_start = time.monotonic()
+                    try:
+                        result, attempts = await self.run_job(agent, job_input)
+                        latency = time.monotonic() - job_start
+                        self.latencies.append(latency)
+                        usage = result.context_wrapper.usage
+                        record = {"id": job_id, "agent": agent.name, "output": _serializable(result.final_output),
+                                  "attempts": attempts, "latency_s": round(latency, 3),
+                                  "input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens}
+                        self.counts["ok"] += 1
+                    except Exception as e:
+                        record = {"id": job_id, "agent": agent.name, "error": f"{type(e).__name__}: {e}"}
+                        self.counts["failed"] += 1
+                    # Single-threaded event loop, so whole-line writes do not interleave
+                    out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    out.flush()
+
+            async def report():
+                while True:
+                    await asyncio.sleep(self.progress_every)
+                    print(self._progress(start))
+
+            # A small queue keeps memory flat however many jobs the iterable yields
+            queue = asyncio.Queue(maxsize=self.concurrency * 2)
+            workers = [asyncio.create_task(worker(queue)) for _ in range(self.concurrency)]
+            reporter = asyncio.create_task(report())
+            try:
+                for job_id, (agent, job_input) in enumerate(jobs):
+                    if job_id in done:
+                        self.counts["skipped"] += 1
+                        continue
+                    await queue.put((job_id, agent, job_input))
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                # If the jobs iterable (or the caller) raised, stop the workers before the
+                #  output file closes; after a normal run they have all returned already
+                for task in workers + [reporter]:
+                    task.cancel()
+                await asyncio.gather(*workers, reporter, return_exceptions=True)
+
+        print("Finished:", self._progress(start), f"| {self.counts['skipped']} already done")
+        return {**self.counts, "seconds": time.monotonic() - start}
+
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    instrument_agents()
+
+    parser = argparse.ArgumentParser(description="Run many agent jobs with bounded concurrency")
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--output", default="batch_results.jsonl")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=500, help="requests per minute")
+    parser.add_argument("--tpm", type=int, default=200_000, help="tokens per minute")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds per attempt")
+    args = parser.parse_args()
+
+    # The two agents from 2_8 / 2_9, with varied inputs
+    essay_agent = Agent(
+        name="Cross_Border_Payments_Essay_Writer",
+        instructions="Write a clear, well-structured essay in 4 paragraphs about the given payments topic.",
+    )
+    note_agent = Agent(
+        name="AgentAPI_Note_Writer",
+        instructions="Write a short note explaining the given aspect of the OpenAI Agents API.",
+    )
+    topics = ["UPI", "SWIFT gpi", "stablecoins", "card networks", "correspondent banking"]
+    aspects = ["tools", "handoffs", "guardrails", "tracing", "sessions"]
+    jobs = (
+        (essay_agent, f"Write the essay about {topics[i % len(topics)]}.") if i % 2 == 0
+        else (note_agent, f"Write the note about {aspects[i % len(aspects)]}.")
+        for i in range(args.jobs)
+    )
+    runner = AgentBatchRunner(args.concurrency, args.rpm, args.tpm, args.timeout)
+    print(asyncio.run(runner.run(jobs, args.output)))
@@ -0,0 +1,188 @@
+# Benchmark: Runner.run_sync vs asyncio.gather(Runner.run) vs a thread pool of run_sync
+#
+# 2_8 (sequential run_sync) and 2_9 (gather of two runs) each print one wall-clock
+# time against the real API. This runs N agents in each execution model against
+# the local mock server (1_Openai/mock_openai_server.py, started in a subprocess
+# with a fixed latency), for several N, and reports:
+#   - throughput (runs/sec)
+#   - p50 / p95 latency of a single run
+#   - event-loop lag: how late a 10 ms timer on the calling loop fires while the
+#     runs are in flight (not applicable to plain run_sync, which owns no caller loop)
+#
+#   python bench_agent_execution.py --sizes 1,8,32,128 --latency-ms 300 --threads 32
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import Agent, OpenAIResponsesModel, Runner, set_tracing_disabled
+from openai import AsyncOpenAI
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai", "mock_openai_server.py")
+LAG_INTERVAL = 0.010
+
+
+# --- Mock server ---
+def start_mock(latency_ms, output_tokens):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, MOCK_SERVER, "--port", str(port), "--latency-ms", str(latency_ms),
+        "--jitter", "0", "--tokens-per-sec", "1000000", "--output-tokens", str(output_tokens),
+    ], stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}/v1"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{base_url}/models", timeout=1)
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("mock server did not start")
+
+
+# --- Agents ---
+_local = threading.local()
+
+
+def make_agent(base_url):
+    # An AsyncOpenAI client belongs to the event loop it is used on, so every
+    #  thread / loop gets its own client and agent
+    client = AsyncOpenAI(base_url=base_url, api_key="mock", max_retries=0)
+    agent = Agent(
+        name="Bench_Writer",
+        instructions="Write a short note on the given topic.",
+        model=OpenAIResponsesModel(model="gpt-4o-mini", openai_client=client),
+    )
+    return agent, client
+
+
+def open_sync_runner(base_url, runners=None):
+    """Gives the current thread its own event loop (reused by run_sync) and agent."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    agent, client = make_agent(base_url)
+    _local.agent = agent
+    if runners is not None:
+        runners.append((loop, client))
+    return loop, client
+
+
+def close_sync_runner(loop, client):
+    # Loops are not bound to threads while idle, so this also works for pool threads
+    loop.run_until_complete(client.close())
+    loop.close()
+
+
+def timed_run_sync(agent, i):
+    start = time.perf_counter()
+    Runner.run_sync(agent, f"Topic number {i}")
+    return time.perf_counter() - start
+
+
+async def timed_run(agent, i):
+    start = time.perf_counter()
+    await Runner.run(agent, f"Topic number {i}")
+    return time.perf_counter() - start
+
+
+async def measure_lag(stop, lags):
+    """Records how much later than requested a short sleep wakes up."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+# --- Execution models ---
+def run_sequential(base_url, n):
+    loop, client = open_sync_runner(base_url)
+    try:
+        return [timed_run_sync(_local.agent, i) for i in range(n)], []
+    finally:
+        close_sync_runner(loop, client)
+        asyncio.set_event_loop(None)
+
+
+def run_gather(base_url, n):
+    async def main():
+        agent, client = make_agent(base_url)
+        stop, lags = asyncio.Event(), []
+        monitor = asyncio.create_task(measure_lag(stop, lags))
+        latencies = await asyncio.gather(*(timed_run(agent, i) for i in range(n)))
+        stop.set()
+        await monitor
+        await client.close()
+        return latencies, lags
+    return asyncio.run(main())
+
+
+def run_thread_pool(base_url, n, threads):
+    async def main():
+        # Called from an async app: the pool keeps the caller's loop free
+        loop = asyncio.get_running_loop()
+        stop, lags, runners = asyncio.Event(), [], []
+        monitor = asyncio.create_task(measure_lag(stop, lags))
+        with ThreadPoolExecutor(max_workers=min(threads, n), initializer=open_sync_runner,
+                                initargs=(base_url, runners)) as pool:
+            latencies = await asyncio.gather(*(
+                loop.run_in_executor(pool, lambda i=i: timed_run_sync(_local.agent, i))
+                for i in range(n)
+            ))
+        stop.set()
+        await monitor
+        return latencies, lags, runners
+
+    latencies, lags, runners = asyncio.run(main())
+    for runner in runners:
+        close_sync_runner(*runner)
+    return latencies, lags
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,8,32,128")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--output-tokens", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--max-sequential", type=int, default=32, help="skip run_sync above this N")
+    args = parser.parse_args()
+
+    set_tracing_disabled(True)
+    process, base_url = start_mock(args.latency_ms, args.output_tokens)
+    try:
+        print(f"Mock server at {base_url}, {args.latency_ms:.0f} ms per call\n")
+        print(f"{'mode':14}{'N':>6}{'runs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'lag p95 ms':>12}{'lag max ms':>12}")
+        for n in (int(s) for s in args.sizes.split(",")):
+            modes = [("gather", lambda: run_gather(base_url, n)),
+                     ("thread pool", lambda: run_thread_pool(base_url, n, args.threads))]
+            if n <= args.max_sequential:
+                modes.insert(0, ("run_sync", lambda: run_sequential(base_url, n)))
+            for name, run in modes:
+                start = time.perf_counter()
+                latencies, lags = run()
+                elapsed = time.perf_counter() - start
+                lag_p95 = f"{percentile(lags, 0.95) * 1000:.1f}" if lags else "-"
+                lag_max = f"{max(lags) * 1000:.1f}" if lags else "-"
+                print(f"{name:14}{n:6}{n / elapsed:9.1f}{percentile(latencies, 0.5) * 1000:9.0f}"
+                      f"{percentile(latencies, 0.95) * 1000:9.0f}{lag_p95:>12}{lag_max:>12}")
+            print()
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
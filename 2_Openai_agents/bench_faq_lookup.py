@@ -0,0 +1,92 @@
+# Benchmark: FAQ lookup latency at 100k+ rows
+#
+# Compares the original query_faq_db (new sqlite3.connect per call, exact topic match)
+# with FAQStore.search (pooled connections, FTS5/BM25 top-k) on a synthetic FAQ table.
+# Also reports how many paraphrased questions each approach finds at all.
+#
+#   python bench_faq_lookup.py --rows 100000 --queries 2000
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from faq_store import FAQStore, connect, ensure_schema
+
+SUBJECTS = ["password", "invoice", "refund", "shipping", "warranty", "account", "order",
+            "subscription", "delivery", "payment", "address", "coupon", "return", "login"]
+ACTIONS = ["reset", "change", "cancel", "track", "update", "download", "apply", "verify"]
+
+
+def build_db(path, rows):
+    """Returns the (action, subject) pair used for each row."""
+    conn = connect(path)
+    ensure_schema(conn)
+    rng = random.Random(0)
+    pairs, batch = [], []
+    for i in range(rows):
+        subject, action = rng.choice(SUBJECTS), rng.choice(ACTIONS)
+        pairs.append((action, subject))
+        topic = f"how do i {action} my {subject} {i}"
+        answer = f"To {action} your {subject}, open settings, choose {subject} and follow step {i}."
+        batch.append((topic, answer, None))
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO faqs (topic, answer, content_hash) VALUES (?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+    return pairs
+
+
+def old_lookup(db_path, topic):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT answer FROM faqs WHERE topic = ?", (topic,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    return ordered[len(ordered) // 2] * 1000, ordered[int(len(ordered) * 0.95)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_faqs.db")
+    start = time.perf_counter()
+    pairs = build_db(path, args.rows)
+    print(f"Built {args.rows:,} FAQ rows (with FTS index) in {time.perf_counter() - start:.1f}s\n")
+
+    rng = random.Random(1)
+    exact, paraphrased = [], []
+    for _ in range(args.queries):
+        i = rng.randrange(args.rows)
+        action, subject = pairs[i]
+        exact.append(f"how do i {action} my {subject} {i}")
+        paraphrased.append(f"{subject} {i} {action}?")  # same words, different order
+
+    store = FAQStore(path, pool_size=4)
+    print(f"{'approach':38}{'p50 ms':>9}{'p95 ms':>9}{'found':>8}")
+    for name, lookup in [
+        ("connect + exact match", lambda q: old_lookup(path, q)),
+        ("pooled FTS5 top-k", lambda q: store.search(q, args.k) or None),
+    ]:
+        for label, questions in [("exact", exact), ("paraphrased", paraphrased)]:
+            latencies, found = [], 0
+            for q in questions:
+                t = time.perf_counter()
+                found += lookup(q) is not None
+                latencies.append(time.perf_counter() - t)
+            p50, p95 = percentiles(latencies)
+            print(f"{name + ' (' + label + ')':38}{p50:9.3f}{p95:9.3f}{found / len(questions):8.0%}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
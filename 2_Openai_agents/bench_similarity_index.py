@@ -0,0 +1,82 @@
+# Benchmark: per-topic cosine_similarity loop vs SimilarityIndex
+#
+# Random 384-dim vectors (the size of all-MiniLM-L6-v2 embeddings) at several
+# index sizes. The Python loop is only timed on a few queries at large sizes;
+# at 1M entries it takes seconds per query.
+#
+#   python bench_similarity_index.py
+#   python bench_similarity_index.py --sizes 1000,100000 --queries 200
+
+import argparse
+import time
+
+import numpy as np
+
+from similarity_index import SimilarityIndex, faiss
+
+DIM = 384
+
+
+def cosine_similarity(vec1, vec2):
+    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+
+
+def loop_search(query, vectors):
+    best, best_score = None, -1
+    for i, emb in enumerate(vectors):
+        score = cosine_similarity(query, emb)
+        if score > best_score:
+            best, best_score = i, score
+    return best
+
+
+def per_query_ms(function, queries, budget=3.0):
+    """Average ms per query; stops early once `budget` seconds are spent."""
+    start, done = time.perf_counter(), 0
+    for q in queries:
+        function(q)
+        done += 1
+        if time.perf_counter() - start > budget:
+            break
+    return (time.perf_counter() - start) / done * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, DIM), dtype=np.float32)
+    print(f"{'entries':>10}{'loop ms':>11}{'f32 ms':>10}{'f16 ms':>10}{'batch ms':>10}"
+          f"{'ann ms':>9}{'speedup':>10}")
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        vectors = rng.standard_normal((size, DIM), dtype=np.float32)
+        keys = range(size)
+        loop = per_query_ms(lambda q: loop_search(q, vectors), queries)
+
+        exact = SimilarityIndex(keys, vectors, ann_threshold=float("inf"))
+        f32 = per_query_ms(lambda q: exact.search(q, args.k), queries)
+        half = SimilarityIndex(keys, vectors, dtype="float16", ann_threshold=float("inf"))
+        f16 = per_query_ms(lambda q: half.search(q, args.k), queries)
+        batches = [queries[i:i + args.batch] for i in range(0, len(queries), args.batch)]
+        batch = per_query_ms(lambda b: exact.search_batch(b, args.k), batches) / args.batch
+
+        ann = "-"
+        if faiss is not None:
+            approximate = SimilarityIndex(keys, vectors, ann_threshold=0)
+            approximate.search(queries[0])  # builds the HNSW graph outside the timing
+            ann = f"{per_query_ms(lambda q: approximate.search(q, args.k), queries):.3f}"
+
+        # Both must agree on the best match
+        assert all(exact.search(q)[0][0] == loop_search(q, vectors) for q in queries[:3])
+        print(f"{size:>10,}{loop:11.3f}{f32:10.3f}{f16:10.3f}{batch:10.3f}{ann:>9}{loop / f32:9.0f}x")
+        del vectors, exact, half
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Benchmark: "generate" vs "retrieve" tool mode for the FAQ agent (2_3)
+#
+# generate - get_faq_answer calls chat.completions itself to rephrase the match,
+#            then the agent makes another call to use the tool result
+# retrieve - get_faq_answer returns the matches and scores, the agent replies directly
+#            (one model round trip less per question)
+#
+# The FAQ/RAG agents (2_3, 2_5, 2_6, 2_7) default to "generate"; start them with
+#  TOOL_MODE=retrieve to opt in to the shorter path.
+#
+# Runs the same questions through both modes with the real API and reports latency
+# per question, model round trips and tokens (agent calls + calls inside the tool).
+#
+#   python bench_tool_modes.py --repeat 3
+
+import argparse
+import asyncio
+import importlib
+import time
+
+from agents import Agent, Runner
+
+faq_bot = importlib.import_module("2_3_openai_agent")
+
+QUESTIONS = [
+    "How long does shipping take?",
+    "Can I send back something I bought three weeks ago?",
+    "Is my blender covered if it breaks after six months?",
+    "Do you take PayPal?",
+    "How do I contact support at night?",
+]
+
+
+class InnerUsage:
+    """Counts the completions made inside the tool (not part of the agent's usage)."""
+
+    def __init__(self, completions):
+        self.requests = self.input_tokens = self.output_tokens = 0
+        self._create = completions.create
+        completions.create = self.create
+
+    def create(self, *args, **kwargs):
+        response = self._create(*args, **kwargs)
+        self.requests += 1
+        self.input_tokens += response.usage.prompt_tokens
+        self.output_tokens += response.usage.completion_tokens
+        return response
+
+
+async def run_mode(mode, repeat, inner):
+    faq_bot.TOOL_MODE = mode  # read by get_faq_answer on every call
+    agent = Agent(
+        name="Customer Support Bot",
+        instructions="You are a helpful assistant who answers customer FAQs using your tool."
+        + (faq_bot.RETRIEVE_INSTRUCTIONS if mode == "retrieve" else ""),
+        tools=[faq_bot.get_faq_answer],
+    )
+    inner.requests = inner.input_tokens = inner.output_tokens = 0
+    latencies, requests, input_tokens, output_tokens = [], 0, 0, 0
+    for _ in range(repeat):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            result = await Runner.run(agent, question)
+            latencies.append(time.perf_counter() - start)
+            usage = result.context_wrapper.usage
+            requests += usage.requests
+            input_tokens += usage.input_tokens
+            output_tokens += usage.output_tokens
+    n = len(latencies)
+    ordered = sorted(latencies)
+    return {
+        "p50_s": ordered[n // 2],
+        "p95_s": ordered[min(n - 1, int(n * 0.95))],
+        "calls": (requests + inner.requests) / n,
+        "input_tokens": (input_tokens + inner.input_tokens) / n,
+        "output_tokens": (output_tokens + inner.output_tokens) / n,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    inner = InnerUsage(faq_bot.client.chat.completions)
+    print(f"{'mode':10}{'p50 s':>8}{'p95 s':>8}{'calls/q':>9}{'in tok/q':>10}{'out tok/q':>11}")
+    for mode in ("generate", "retrieve"):
+        r = await run_mode(mode, args.repeat, inner)
+        print(f"{mode:10}{r['p50_s']:8.2f}{r['p95_s']:8.2f}{r['calls']:9.1f}"
+              f"{r['input_tokens']:10.0f}{r['output_tokens']:11.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
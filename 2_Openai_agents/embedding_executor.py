@@ -0,0 +1,162 @@
+# Off-loop, micro-batched query embedding for the async support bot (2_6)
+#
+# embedding_model.encode() is CPU-bound; called inside an async tool it blocks the
+# event loop, so every other chat session waits. EmbeddingExecutor:
+#   - runs encode() on a worker thread (or any concurrent.futures executor)
+#   - collects the texts that arrive within `max_wait_ms` of each other (up to
+#     `max_batch`) and encodes them in ONE batched call, resolving each caller's future
+#   - keeps metrics: batch sizes, encode time and event-loop lag
+#
+#   embedder = EmbeddingExecutor(embedding_model.encode)
+#   vector = await embedder.embed("how long is shipping?")
+#   embedder.stats()
+#
+#   python embedding_executor.py --sessions 64   # on-loop encode vs executor under load
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LAG_INTERVAL = 0.010
+
+
+def _p95(values):
+    ordered = sorted(values)
+    return ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0
+
+
+class EmbeddingExecutor:
+    def __init__(self, encode, max_batch=64, max_wait_ms=5.0, executor=None, monitor_lag=True):
+        self.encode = encode
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        # One thread is enough: batching, not parallelism, is what saves the work
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self.monitor_lag = monitor_lag
+        self.queue = None
+        self.tasks = []
+        self.batch_sizes = []
+        self.encode_seconds = 0.0
+        self.lags = []
+
+    def _start(self):
+        # Started lazily, on the loop that actually serves requests (e.g. Gradio's)
+        self.queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._batcher())]
+        if self.monitor_lag:
+            self.tasks.append(asyncio.create_task(self._lag_monitor()))
+
+    async def embed(self, text):
+        """Embedding of one text; concurrent callers share a batched encode() call."""
+        if self.queue is None:
+            self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(self.executor, self.encode, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.encode_seconds += time.perf_counter() - start
+            self.batch_sizes.append(len(batch))
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():  # the caller may have been cancelled meanwhile
+                    future.set_result(vector)
+
+    async def _lag_monitor(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lags.append(time.perf_counter() - start - LAG_INTERVAL)
+            if len(self.lags) > 10_000:
+                self.lags = self.lags[-5_000:]
+
+    def stats(self):
+        sizes = self.batch_sizes
+        return {
+            "texts": sum(sizes),
+            "batches": len(sizes),
+            "mean_batch": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "max_batch": max(sizes, default=0),
+            "encode_seconds": round(self.encode_seconds, 3),
+            "loop_lag_p95_ms": round(_p95(self.lags) * 1000, 2),
+            "loop_lag_max_ms": round(max(self.lags, default=0.0) * 1000, 2),
+        }
+
+    async def close(self):
+        for task in self.tasks:
+            task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+# --- Load test ---
+async def _simulate(sessions, questions, embed_one):
+    """`sessions` chats each embedding `questions` queries; returns (seconds, lag p95, lag max)."""
+    lags, stop = [], asyncio.Event()
+
+    async def monitor():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+    async def session(s):
+        for q in range(questions):
+            await embed_one(f"session {s} question {q}: how long does shipping take?")
+            await asyncio.sleep(0.01)  # the rest of the chat turn
+
+    task = asyncio.create_task(monitor())
+    start = time.perf_counter()
+    await asyncio.gather(*(session(s) for s in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return elapsed, _p95(lags) * 1000, max(lags, default=0.0) * 1000
+
+
+async def _load_test(sessions, questions):
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model.encode(["warm up"])
+
+    async def on_loop(text):
+        return model.encode(text)  # what 2_6 did: blocks the loop
+
+    seconds, lag_p95, lag_max = await _simulate(sessions, questions, on_loop)
+    print(f"{'on-loop encode':22}{seconds:8.2f}s  lag p95 {lag_p95:7.1f} ms  max {lag_max:7.1f} ms")
+
+    embedder = EmbeddingExecutor(model.encode, monitor_lag=False)
+    seconds, lag_p95, lag_max = await _simulate(sessions, questions, embedder.embed)
+    print(f"{'executor + batching':22}{seconds:8.2f}s  lag p95 {lag_p95:7.1f} ms  max {lag_max:7.1f} ms")
+    print("Batches:", embedder.stats())
+    await embedder.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=64, help="concurrent chat sessions")
+    parser.add_argument("--questions", type=int, default=5, help="questions per session")
+    args = parser.parse_args()
+    asyncio.run(_load_test(args.sessions, args.questions))
@@ -0,0 +1,89 @@
+# Persistent embedding cache stored in the FAQ database itself (2_5, 2_6)
+#
+# Encoding every FAQ answer with the sentence-transformer on each start costs
+# O(corpus) model inference. EmbeddingStore keeps each vector in a BLOB column,
+# keyed by (model name, hash of the text), so:
+#   - a restart encodes nothing and just reads float32 bytes back
+#   - a new or edited answer has a new hash, so only that one is encoded
+#   - switching models never mixes vectors from different models
+#
+#   store = EmbeddingStore("faqs.db", "all-MiniLM-L6-v2")
+#   vectors = store.embed(answers, embedding_model.encode)   # (len(answers), dim) float32
+#   print(store.last_stats)   # {"texts": ..., "cached": ..., "encoded": ..., "seconds": ...}
+#   store.prune(answers)      # drop vectors of answers that were edited or deleted
+
+import hashlib
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+
+
+MAX_PARAMS = 500  # hashes per IN (...) query, under SQLite's bound-parameter limit
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, db_path, model_name):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.last_stats = None
+        # closing() closes the connection; `with conn` only commits or rolls back
+        with closing(sqlite3.connect(db_path)) as conn, conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """)
+
+    def embed(self, texts, encode, batch_size=64):
+        """
+        Embeddings for `texts` in order, as one float32 matrix.
+        Only texts without a stored vector are passed to encode(list, batch_size=...).
+        """
+        start = time.perf_counter()
+        texts = list(texts)
+        hashes = [text_hash(t) for t in texts]
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            # Only the vectors asked for (primary-key lookups), not every vector of the model
+            wanted = list(dict.fromkeys(hashes))
+            stored = {}
+            for i in range(0, len(wanted), MAX_PARAMS):
+                batch = wanted[i:i + MAX_PARAMS]
+                stored.update(conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(batch))})",
+                    (self.model_name, *batch),
+                ))
+
+            missing = {h: t for h, t in zip(hashes, texts) if h not in stored}
+            if missing:
+                encoded = np.asarray(encode(list(missing.values()), batch_size=batch_size), dtype=np.float32)
+                rows = [(self.model_name, h, encoded.shape[1], v.tobytes()) for h, v in zip(missing, encoded)]
+                conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                stored.update((h, blob) for _, h, _, blob in rows)
+
+        # One join + frombuffer instead of one small array per row
+        matrix = np.frombuffer(b"".join(stored[h] for h in hashes), dtype=np.float32)
+        matrix = matrix.reshape(len(texts), -1) if texts else matrix.reshape(0, 0)
+        self.last_stats = {"texts": len(texts), "cached": len(texts) - len(missing),
+                           "encoded": len(missing), "seconds": time.perf_counter() - start}
+        return matrix
+
+    def prune(self, keep_texts):
+        """Deletes this model's vectors for texts that are no longer in `keep_texts`."""
+        keep = {text_hash(t) for t in keep_texts}
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            existing = [h for (h,) in conn.execute(
+                "SELECT text_hash FROM embeddings WHERE model = ?", (self.model_name,))]
+            stale = [(self.model_name, h) for h in existing if h not in keep]
+            conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", stale)
+        return len(stale)
@@ -0,0 +1,242 @@
+# SQLite FAQ store for the customer service agent (2_10)
+#
+# sync_csv() loads Conversation.csv into the faqs table:
+#   - the CSV is streamed in chunks (pandas chunksize), never fully in memory
+#   - rows are written with executemany inside ONE transaction, with WAL and
+#     relaxed-sync pragmas
+#   - each row carries a hash of its answer; only new or changed rows are written
+#   - if the CSV file itself is unchanged since the last sync, nothing is read at all
+#
+# FAQStore answers lookups from a small pool of open connections and an FTS5 index
+# over topic and answer, ranked by BM25, so paraphrased questions still find a match.
+
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+CHUNK_SIZE = 50_000
+
+
+def connect(db_path, check_same_thread=True):
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")      # readers don't block the writer
+    conn.execute("PRAGMA synchronous=NORMAL")    # safe with WAL, far fewer fsyncs
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")     # 64 MB page cache
+    return conn
+
+
+def ensure_schema(conn):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS faqs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT NOT NULL UNIQUE,
+        answer TEXT NOT NULL
+    )
+    """)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(faqs)")}
+    if "content_hash" not in columns:
+        # Older databases created by init_db() have no hash column yet
+        conn.execute("ALTER TABLE faqs ADD COLUMN content_hash TEXT")
+    # Rows written without a hash get one here, so the next sync only counts real
+    #  answer changes instead of rewriting (and reporting) every row
+    conn.create_function("answer_hash", 1, _answer_hash, deterministic=True)
+    conn.execute("UPDATE faqs SET content_hash = answer_hash(answer) WHERE content_hash IS NULL")
+    ensure_fts(conn)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS sync_state (
+        source TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        synced_at REAL NOT NULL
+    )
+    """)
+    conn.commit()
+
+
+def ensure_fts(conn):
+    """Full-text index over faqs(topic, answer), kept in sync by triggers."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faqs_fts'"
+    ).fetchone()
+    conn.executescript("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS faqs_fts USING fts5(
+        topic, answer, content='faqs', content_rowid='id', tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS faqs_fts_insert AFTER INSERT ON faqs BEGIN
+        INSERT INTO faqs_fts (rowid, topic, answer) VALUES (new.id, new.topic, new.answer);
+    END;
+    CREATE TRIGGER IF NOT EXISTS faqs_fts_delete AFTER DELETE ON faqs BEGIN
+        INSERT INTO faqs_fts (faqs_fts, rowid, topic, answer) VALUES ('delete', old.id, old.topic, old.answer);
+    END;
+    CREATE TRIGGER IF NOT EXISTS faqs_fts_update AFTER UPDATE ON faqs BEGIN
+        INSERT INTO faqs_fts (faqs_fts, rowid, topic, answer) VALUES ('delete', old.id, old.topic, old.answer);
+        INSERT INTO faqs_fts (rowid, topic, answer) VALUES (new.id, new.topic, new.answer);
+    END;
+    """)
+    if not exists:
+        # Index rows that were loaded before the index existed
+        conn.execute("INSERT INTO faqs_fts (faqs_fts) VALUES ('rebuild')")
+    conn.commit()
+
+
+def _answer_hash(answer: str) -> str:
+    return hashlib.blake2b(answer.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def sync_csv(db_path, csv_path, chunksize=CHUNK_SIZE, force=False):
+    """
+    Upserts CSV rows (question -> topic, answer) whose answer changed since the last sync.
+    Returns {"rows": read, "written": inserted or updated, "seconds": ..., "rows_per_sec": ...}.
+    """
+    start = time.perf_counter()
+    conn = connect(db_path)
+    ensure_schema(conn)
+
+    source = os.path.abspath(csv_path)
+    stat = os.stat(csv_path)
+    row = conn.execute("SELECT size, mtime FROM sync_state WHERE source = ?", (source,)).fetchone()
+    if not force and row == (stat.st_size, stat.st_mtime):
+        conn.close()
+        return {"rows": 0, "written": 0, "seconds": time.perf_counter() - start, "rows_per_sec": 0.0}
+
+    rows_read, written = 0, 0
+    seen = set()  # the first occurrence of a question wins, as before
+    try:
+        conn.execute("BEGIN")
+        for chunk in pd.read_csv(csv_path, usecols=["question", "answer"], dtype=str,
+                                 keep_default_na=False, chunksize=chunksize):
+            batch = []
+            for topic, answer in zip(chunk["question"].str.strip(), chunk["answer"].str.strip()):
+                rows_read += 1
+                if not topic or not answer or topic in seen:
+                    continue
+                seen.add(topic)
+                batch.append((topic, answer, _answer_hash(answer)))
+            # The WHERE clause turns unchanged rows into no-ops (nothing rewritten)
+            written += conn.executemany("""
+            INSERT INTO faqs (topic, answer, content_hash) VALUES (?, ?, ?)
+            ON CONFLICT(topic) DO UPDATE SET answer = excluded.answer, content_hash = excluded.content_hash
+            WHERE faqs.content_hash IS NOT excluded.content_hash
+            """, batch).rowcount
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (source, size, mtime, synced_at) VALUES (?, ?, ?, ?)",
+            (source, stat.st_size, stat.st_mtime, time.time()),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows_read, "written": max(0, written), "seconds": seconds,
+            "rows_per_sec": rows_read / seconds if seconds else 0.0}
+
+
+# --- Lookups ---
+class ConnectionPool:
+    """A fixed set of open connections handed out one at a time (thread-safe)."""
+
+    def __init__(self, db_path, size=4):
+        self.connections = queue.Queue()
+        for _ in range(size):
+            conn = connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA query_only=ON")
+            self.connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        finally:
+            self.connections.put(conn)
+
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get().close()
+
+
+# Words too common to help ranking; leaving them out keeps FTS posting lists short
+STOPWORDS = {
+    "a", "an", "the", "i", "me", "my", "you", "your", "we", "our", "it", "is", "are", "was",
+    "be", "do", "does", "did", "to", "of", "in", "on", "for", "and", "or", "can", "how",
+    "what", "when", "where", "why", "with", "this", "that", "s",
+}
+
+
+def fts_terms(text: str) -> list[str]:
+    words = re.findall(r"\w+", text.lower())
+    terms = [w for w in words if w not in STOPWORDS]
+    return terms or words
+
+
+def fts_query(terms, operator=" ") -> str:
+    # Each word is quoted, so user punctuation can't break FTS5 syntax.
+    # " " means AND (all words must match), " OR " means any word
+    return operator.join(f'"{t}"' for t in terms)
+
+
+class FAQStore:
+    def __init__(self, db_path, pool_size=4):
+        conn = connect(db_path)
+        ensure_schema(conn)
+        conn.close()
+        self.pool = ConnectionPool(db_path, pool_size)
+        # PRAGMA data_version is per connection, so changes are watched through one
+        self._watch = connect(db_path, check_same_thread=False)
+        self._watch_lock = threading.Lock()
+
+    def data_version(self):
+        """Changes whenever another connection (e.g. sync_csv) commits to the database."""
+        with self._watch_lock:
+            return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def _match(self, conn, match, k):
+        # bm25() is lower-is-better; topic matches weigh twice as much as answer matches
+        return conn.execute("""
+        SELECT faqs.topic, faqs.answer, -bm25(faqs_fts, 2.0, 1.0) AS score
+        FROM faqs_fts JOIN faqs ON faqs.id = faqs_fts.rowid
+        WHERE faqs_fts MATCH ?
+        ORDER BY bm25(faqs_fts, 2.0, 1.0)
+        LIMIT ?
+        """, (match, k)).fetchall()
+
+    def search(self, question: str, k=3):
+        """Top-k [(topic, answer, score)], best first. An exact topic match scores highest."""
+        question = question.strip()
+        terms = fts_terms(question)
+        if not terms:
+            return []
+        with self.pool.connection() as conn:
+            exact = conn.execute("SELECT topic, answer FROM faqs WHERE topic = ?", (question,)).fetchone()
+            # Rows containing all words first: few candidates to score, so it stays fast.
+            # Any-word matching can score a large part of the table; only used when needed
+            rows = self._match(conn, fts_query(terms), k)
+            if not rows and len(terms) > 1:
+                rows = self._match(conn, fts_query(terms, " OR "), k)
+        if exact:
+            top = max((score for _, _, score in rows), default=0.0)
+            rows = [(exact[0], exact[1], top + 1.0)] + [r for r in rows if r[0] != exact[0]][:k - 1]
+        return rows
+
+    def close(self):
+        self.pool.close()
+        self._watch.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    stats = sync_csv(sys.argv[1], sys.argv[2], force="--force" in sys.argv)
+    print(f"{stats['rows']} rows read, {stats['written']} written in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec)")
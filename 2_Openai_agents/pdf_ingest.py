@@ -0,0 +1,156 @@
+# Chunking + embedding pipeline for the PDF RAG bot (2_7)
+#
+#   chunks, vectors, stats = load_or_build_index("new_india_assurance.pdf", "all-MiniLM-L6-v2")
+#
+# - Text is split on sentence boundaries into chunks of up to `chunk_size` characters;
+#   each chunk starts with the last ~`overlap` characters of whole sentences from the
+#   previous one (or the word-aligned tail of a longer last sentence), so an answer
+#   spanning a boundary is still found in one chunk
+# - Chunks are encoded in large batches (`batch_size`), optionally across a process
+#   pool (`workers`) for big document sets
+# - chunks and vectors are saved under .rag_index/, keyed by the PDF's sha256 and the
+#   chunking/model settings; later starts just load them (vectors memory-mapped)
+#
+# Text extraction reuses 1_Openai/pdf_extract.py (parallel and cached as well).
+# With workers > 1, call from under `if __name__ == "__main__":` (process pool).
+
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from pdf_extract import extract_pdf, file_hash  # noqa: E402
+
+INDEX_DIR = ".rag_index"
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_END.split(text) if s and s.strip()]
+
+
+def sentence_chunks(text, chunk_size=500, overlap=100):
+    """Chunks of whole sentences (up to chunk_size chars), overlapping by ~overlap chars."""
+    sentences = []
+    for sentence in split_sentences(text):
+        # A "sentence" longer than a chunk (tables, lists) is cut at word boundaries
+        while len(sentence) > chunk_size:
+            cut = sentence.rfind(" ", 0, chunk_size)
+            cut = cut if cut > 0 else chunk_size
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks, current = [], []
+    for sentence in sentences:
+        if current and sum(len(s) + 1 for s in current) + len(sentence) > chunk_size:
+            chunks.append(" ".join(current))
+            # Carry the trailing sentences (up to `overlap` chars) into the next chunk
+            carried = []
+            for s in reversed(current):
+                if sum(len(c) + 1 for c in carried) + len(s) > overlap:
+                    break
+                carried.insert(0, s)
+            if not carried and overlap > 0:
+                # Last sentence longer than `overlap`: carry its tail, cut at a word boundary
+                tail = current[-1][-overlap:]
+                space = tail.find(" ")
+                carried = [tail[space + 1:] if 0 <= space < len(tail) - 1 else tail]
+            if sum(len(c) + 1 for c in carried) + len(sentence) > chunk_size:
+                carried = []
+            current = carried
+        current.append(sentence)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# --- Encoding ---
+_worker_model = None
+
+
+def _init_worker(model_name):
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_shard(args):
+    texts, batch_size = args
+    return _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+def encode_chunks(chunks, model_name, batch_size=64, workers=0, model=None):
+    """(len(chunks), dim) float32 embeddings. workers > 1 splits the chunks across processes."""
+    if workers > 1 and len(chunks) >= workers * batch_size:
+        shard = -(-len(chunks) // workers)
+        shards = [(chunks[i:i + shard], batch_size) for i in range(0, len(chunks), shard)]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(model_name,)) as pool:
+            return np.concatenate(list(pool.map(_encode_shard, shards))).astype(np.float32)
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+    if not chunks:
+        # e.g. a scanned PDF with no text layer: keep the (0, dim) shape for the index
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.asarray(model.encode(chunks, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+
+
+# --- Persisted index ---
+def load_or_build_index(pdf_path, model_name, chunk_size=500, overlap=100,
+                        batch_size=64, workers=0, model=None):
+    """Returns (chunks, vectors, stats); stats has chunks, seconds, chunks_per_sec and cached."""
+    start = time.perf_counter()
+    key = f"{file_hash(pdf_path)[:16]}-{model_name.replace('/', '_')}-{chunk_size}-{overlap}"
+    folder = os.path.join(os.path.dirname(os.path.abspath(pdf_path)), INDEX_DIR)
+    chunks_path = os.path.join(folder, f"{key}.json")
+    vectors_path = os.path.join(folder, f"{key}.npy")
+
+    if os.path.exists(chunks_path) and os.path.exists(vectors_path):
+        with open(chunks_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        vectors = np.load(vectors_path, mmap_mode="r")
+        seconds = time.perf_counter() - start
+        return chunks, vectors, {"chunks": len(chunks), "seconds": seconds,
+                                 "chunks_per_sec": None, "cached": True}
+
+    text, _ = extract_pdf(pdf_path)
+    chunks = sentence_chunks(text, chunk_size, overlap)
+    encode_start = time.perf_counter()
+    vectors = encode_chunks(chunks, model_name, batch_size, workers, model)
+    encode_seconds = time.perf_counter() - encode_start
+
+    os.makedirs(folder, exist_ok=True)
+    np.save(vectors_path, vectors)
+    with open(chunks_path, "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False)
+    return chunks, vectors, {"chunks": len(chunks), "seconds": time.perf_counter() - start,
+                             "chunks_per_sec": len(chunks) / encode_seconds if encode_seconds else None,
+                             "cached": False}
+
+
+if __name__ == "__main__":
+    # python pdf_ingest.py file.pdf [--batch-size 128] [--workers 4] - (re)build and report speed
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdf")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+    chunks, vectors, stats = load_or_build_index(args.pdf, args.model, args.chunk_size, args.overlap,
+                                                 args.batch_size, args.workers)
+    if stats["cached"]:
+        print(f"Loaded {stats['chunks']} chunks from {INDEX_DIR}/ in {stats['seconds']:.2f}s")
+    else:
+        print(f"Built {stats['chunks']} chunks in {stats['seconds']:.2f}s "
+              f"({stats['chunks_per_sec']:.1f} chunks/sec encoding)")
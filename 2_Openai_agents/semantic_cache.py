@@ -0,0 +1,118 @@
+# Semantic answer cache for the customer service agent (2_10)
+#
+# The short-term memory only hits when a question is repeated word for word.
+# This cache embeds each question and serves a stored answer when a previous
+# question was close enough in meaning ("reset password how" ~ "How do I reset
+# my password?"), skipping the Runner.run round trip:
+#   - embeddings live in one pre-normalized float32 matrix, so a lookup is a
+#     single matrix-vector product over all entries
+#   - a similarity threshold decides what counts as "the same question"
+#   - entries expire after a TTL; when full, the least recently used one goes
+#   - check_version() clears everything when the FAQ table changed
+#   - stats() reports hit rate and the LLM time the hits saved
+#
+#   cache = SemanticCache(lambda texts: model.encode(texts, normalize_embeddings=True))
+#   hit = cache.lookup("reset password how")        # None or (answer, similarity, question)
+#   cache.put("How do I reset my password?", answer, seconds=llm_seconds)
+
+import threading
+import time
+
+import numpy as np
+
+
+class SemanticCache:
+    def __init__(self, embed, threshold=0.88, ttl=24 * 3600, max_entries=5000):
+        self.embed = embed                # list[str] -> array (n, dim)
+        self.threshold = threshold        # cosine similarity needed to serve a cached answer
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.vectors = None               # (max_entries, dim) float32, allocated on first put
+        self.expires = np.zeros(max_entries)                   # 0 = free slot
+        self.last_used = np.zeros(max_entries)
+        self.entries = [None] * max_entries                    # (question, answer)
+        self.version = None
+        self.lock = threading.Lock()
+        self.counters = {"lookups": 0, "hits": 0, "invalidations": 0,
+                         "lookup_seconds": 0.0, "saved_seconds": 0.0}
+        self.miss_seconds = []            # recent LLM latencies, to estimate what a hit saves
+
+    def _vector(self, text):
+        v = np.asarray(self.embed([text]), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    # --- lookups ---
+    def lookup(self, question):
+        """Returns (answer, similarity, cached_question) or None."""
+        start = time.perf_counter()
+        query = self._vector(question)
+        now = time.monotonic()
+        with self.lock:
+            self.counters["lookups"] += 1
+            hit = None
+            if self.vectors is not None:
+                scores = self.vectors @ query
+                scores[self.expires <= now] = -1.0   # free and expired slots never match
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self.last_used[best] = now
+                    cached_question, answer = self.entries[best]
+                    hit = (answer, float(scores[best]), cached_question)
+            elapsed = time.perf_counter() - start
+            self.counters["lookup_seconds"] += elapsed
+            if hit:
+                self.counters["hits"] += 1
+                if self.miss_seconds:
+                    average = sum(self.miss_seconds) / len(self.miss_seconds)
+                    self.counters["saved_seconds"] += max(0.0, average - elapsed)
+        return hit
+
+    # --- updates ---
+    def put(self, question, answer, seconds=None):
+        """Stores an answer; `seconds` is how long it took to produce (for savings stats)."""
+        vector = self._vector(question)
+        now = time.monotonic()
+        with self.lock:
+            if seconds is not None:
+                self.miss_seconds = (self.miss_seconds + [seconds])[-100:]
+            if self.vectors is None:
+                self.vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            free = np.flatnonzero(self.expires <= now)
+            # A free or expired slot if there is one, otherwise the least recently used entry
+            slot = int(free[0]) if free.size else int(np.argmin(self.last_used))
+            self.vectors[slot] = vector
+            self.expires[slot] = now + self.ttl if self.ttl else np.inf
+            self.last_used[slot] = now
+            self.entries[slot] = (question, answer)
+
+    def invalidate(self):
+        with self.lock:
+            self.expires[:] = 0
+            self.entries = [None] * self.max_entries
+            self.counters["invalidations"] += 1
+
+    def check_version(self, version):
+        """Clears the cache when `version` (e.g. FAQStore.data_version()) differs from last time."""
+        if self.version is not None and version != self.version:
+            self.invalidate()
+        self.version = version
+
+    # --- introspection ---
+    def __len__(self):
+        with self.lock:
+            return int(np.count_nonzero(self.expires > time.monotonic()))
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["lookups"]
+            return {
+                "lookups": lookups,
+                "hits": self.counters["hits"],
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "avg_lookup_ms": 1000 * self.counters["lookup_seconds"] / lookups if lookups else 0.0,
+                "saved_seconds": round(self.counters["saved_seconds"], 2),
+                "invalidations": self.counters["invalidations"],
+                "entries": int(np.count_nonzero(self.expires > time.monotonic())),
+            }
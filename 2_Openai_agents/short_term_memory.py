@@ -0,0 +1,322 @@
+# Short-term memory cache for the customer service agent (2_10)
+#
+# Replaces the plain LRUCache:
+#   - bounded by number of entries AND by bytes
+#   - per-entry TTL (expired entries count as misses)
+#   - negative caching ("we already know we cannot answer this") kept apart from
+#     real answers, so it never evicts them
+#   - hit / miss / eviction counters via stats()
+#   - one lock around every operation: safe from many coroutines and threads
+#     (no operation awaits, so a threading.Lock never blocks the event loop for long)
+#
+# Eviction policies:
+#   "lru"     - classic least recently used
+#   "slru"    - segmented LRU: new keys start in a probation segment and only move to
+#               the protected segment on a second hit, so one-off queries are evicted
+#               before hot FAQs
+#   "tinylfu" - SLRU plus TinyLFU admission: when full, a new key is only admitted if it
+#               has been asked more often (approximately) than the entry it would evict
+#
+# Persistence: start_snapshots(path) writes the entries, in recency order and with
+# their hit counts, to a gzipped JSON file every few minutes from a background
+# thread; restore(path) reloads the hottest ones on the next start.
+
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+HIT, NEGATIVE, MISS = "hit", "negative", "miss"
+
+
+def _size_of(key, value):
+    def size(x):
+        if isinstance(x, str):
+            return len(x.encode("utf-8"))
+        if isinstance(x, (bytes, bytearray)):
+            return len(x)
+        return sys.getsizeof(x)
+    return size(key) + size(value) + 64  # + rough per-entry bookkeeping
+
+
+class FrequencySketch:
+    """Count-min sketch of how often keys were seen; halves all counts every `sample` adds."""
+
+    def __init__(self, width=4096, depth=4, sample=None):
+        self.width = width
+        self.rows = [[0] * width for _ in range(depth)]
+        self.seeds = [0x9E3779B1 * (i + 1) for i in range(depth)]
+        self.sample = sample or width * 10
+        self.additions = 0
+
+    def _indexes(self, key):
+        # Multiply-shift per row: taking high bits of the 64-bit product mixes the whole
+        # hash, so keys that share a slot in one row are spread apart in the others
+        h = hash(key)
+        return [((((h ^ seed) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % self.width
+                for seed in self.seeds]
+
+    def add(self, key):
+        for row, i in zip(self.rows, self._indexes(key)):
+            if row[i] < 15:  # 4-bit counters, as in TinyLFU
+                row[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample:
+            # Aging: recent popularity matters more than all-time popularity
+            self.rows = [[c >> 1 for c in row] for row in self.rows]
+            self.additions //= 2
+
+    def estimate(self, key):
+        return min(row[i] for row, i in zip(self.rows, self._indexes(key)))
+
+
+class ShortTermMemory:
+    def __init__(self, max_entries=500, max_bytes=1_000_000, ttl=None,
+                 negative_ttl=300, max_negative=1000, policy="lru", protected_ratio=0.8):
+        if policy not in ("lru", "slru", "tinylfu"):
+            raise ValueError(f"Unknown policy {policy!r}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl                    # default seconds an answer stays valid (None = forever)
+        self.negative_ttl = negative_ttl  # seconds a "cannot help" result is remembered
+        self.max_negative = max_negative
+        self.policy = policy
+        self.protected_max = int(max_entries * protected_ratio) if policy != "lru" else 0
+
+        # key -> (value, expires_at, size); probation is the only segment for plain LRU
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.negative = OrderedDict()     # key -> expires_at
+        self.sketch = FrequencySketch() if policy == "tinylfu" else None
+        self.bytes = 0
+        self.hit_counts = {}              # key -> hits since it was stored (for snapshots)
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "negative_hits": 0, "evictions": 0,
+                         "expirations": 0, "rejections": 0}
+
+    # --- lookups ---
+    def lookup(self, key):
+        """Returns (HIT, value), (NEGATIVE, None) or (MISS, None)."""
+        now = time.monotonic()
+        with self.lock:
+            if self.sketch:
+                self.sketch.add(key)
+            for segment in (self.protected, self.probation):
+                if key in segment:
+                    value, expires_at, size = segment[key]
+                    if expires_at is not None and expires_at <= now:
+                        del segment[key]
+                        self.bytes -= size
+                        self.hit_counts.pop(key, None)
+                        self.counters["expirations"] += 1
+                        break
+                    self._touch(segment, key)
+                    self.counters["hits"] += 1
+                    self.hit_counts[key] = self.hit_counts.get(key, 0) + 1
+                    return HIT, value
+            expires_at = self.negative.get(key)
+            if expires_at is not None:
+                if expires_at > now:
+                    self.counters["negative_hits"] += 1
+                    return NEGATIVE, None
+                del self.negative[key]
+            self.counters["misses"] += 1
+            return MISS, None
+
+    def get(self, key):
+        status, value = self.lookup(key)
+        return value if status == HIT else None
+
+    def contains(self, key):
+        with self.lock:
+            return key in self.protected or key in self.probation
+
+    def _touch(self, segment, key):
+        if segment is self.probation and self.policy != "lru":
+            # Second hit: promote to the protected segment
+            self.protected[key] = self.probation.pop(key)
+            while len(self.protected) > self.protected_max:
+                demoted_key, demoted = self.protected.popitem(last=False)
+                self.probation[demoted_key] = demoted
+        else:
+            segment.move_to_end(key)
+
+    # --- updates ---
+    def put(self, key, value, ttl=None):
+        """Stores a real answer; returns False if TinyLFU admission rejected it."""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        size = _size_of(key, value)
+        if size > self.max_bytes:
+            return False
+        with self.lock:
+            self.negative.pop(key, None)
+            for segment in (self.protected, self.probation):
+                if key in segment:
+                    self.bytes -= segment[key][2]
+                    segment[key] = (value, expires_at, size)
+                    segment.move_to_end(key)
+                    self.bytes += size
+                    self._evict_until_fits(0, 0)
+                    return True
+
+            if self.sketch and not self._admit(key, size):
+                self.counters["rejections"] += 1
+                return False
+            self._evict_until_fits(1, size)
+            self.probation[key] = (value, expires_at, size)
+            self.bytes += size
+            return True
+
+    def put_negative(self, key, ttl=None):
+        """Remembers that `key` had no answer, without touching the real entries."""
+        ttl = ttl if ttl is not None else self.negative_ttl
+        with self.lock:
+            self.negative[key] = time.monotonic() + ttl
+            self.negative.move_to_end(key)
+            while len(self.negative) > self.max_negative:
+                self.negative.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drops one key, or everything when key is None (e.g. the FAQ table changed)."""
+        with self.lock:
+            if key is None:
+                self.probation.clear()
+                self.protected.clear()
+                self.negative.clear()
+                self.hit_counts.clear()
+                self.bytes = 0
+                return
+            self.negative.pop(key, None)
+            self.hit_counts.pop(key, None)
+            for segment in (self.protected, self.probation):
+                if key in segment:
+                    self.bytes -= segment.pop(key)[2]
+
+    def _victim(self):
+        if self.probation:
+            return self.probation, next(iter(self.probation))
+        if self.protected:
+            return self.protected, next(iter(self.protected))
+        return None, None
+
+    def _admit(self, key, size):
+        if len(self) < self.max_entries and self.bytes + size <= self.max_bytes:
+            return True
+        _, victim = self._victim()
+        return victim is None or self.sketch.estimate(key) > self.sketch.estimate(victim)
+
+    def _evict_until_fits(self, extra_entries, extra_bytes):
+        while self.probation or self.protected:
+            if (len(self) + extra_entries <= self.max_entries
+                    and self.bytes + extra_bytes <= self.max_bytes):
+                return
+            segment, victim = self._victim()
+            self.bytes -= segment.pop(victim)[2]
+            self.hit_counts.pop(victim, None)
+            self.counters["evictions"] += 1
+
+    # --- introspection ---
+    def __len__(self):
+        return len(self.probation) + len(self.protected)
+
+    def items(self):
+        """(key, value) pairs, most recently used last (protected after probation)."""
+        with self.lock:
+            return [(k, v[0]) for k, v in list(self.probation.items()) + list(self.protected.items())]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["misses"] + self.counters["negative_hits"]
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / lookups if lookups else 0.0,
+                "entries": len(self),
+                "bytes": self.bytes,
+                "negative_entries": len(self.negative),
+            }
+
+    # --- persistence ---
+    def snapshot(self):
+        """Entries as [key, value, expires (wall clock or None), hits, protected], least recent first."""
+        now_wall, now = time.time(), time.monotonic()
+        with self.lock:
+            # Only a shallow copy is taken under the lock; callers serialize outside it
+            segments = [(False, list(self.probation.items())), (True, list(self.protected.items()))]
+            hits = dict(self.hit_counts)
+        return [
+            [key, value, None if expires_at is None else now_wall + (expires_at - now), hits.get(key, 0), protected]
+            for protected, entries in segments
+            for key, (value, expires_at, _) in entries
+            if expires_at is None or expires_at > now
+        ]
+
+    def save(self, path):
+        """Writes a snapshot atomically (temp file + rename); returns the number of entries."""
+        entries = self.snapshot()
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "policy": self.policy, "entries": entries}, f,
+                      separators=(",", ":"))
+        os.replace(tmp, path)
+        return len(entries)
+
+    def start_snapshots(self, path, interval=300):
+        """Saves to `path` every `interval` seconds from a daemon thread."""
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.save(path)
+                except OSError as e:
+                    print(f"Short-term memory snapshot failed: {e}")
+        thread = threading.Thread(target=run, name="stm-snapshots", daemon=True)
+        thread.start()
+        return thread
+
+    def restore(self, path):
+        """
+        Loads a snapshot, hottest entries first (most hits, then most recent) until the
+        cache is full, and re-inserts them in their original recency order.
+        Returns the number of entries restored (0 if there is no snapshot).
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+        except FileNotFoundError:
+            return 0
+        now_wall, now = time.time(), time.monotonic()
+        live = [(order, e) for order, e in enumerate(entries) if e[2] is None or e[2] > now_wall]
+        hottest = sorted(live, key=lambda item: (item[1][3], item[0]), reverse=True)
+
+        chosen, used_bytes = [], self.bytes
+        for order, (key, value, expires, hits, protected) in hottest:
+            size = _size_of(key, value)
+            if len(chosen) + len(self) >= self.max_entries or used_bytes + size > self.max_bytes:
+                continue
+            chosen.append((order, key, value, expires, hits, protected, size))
+            used_bytes += size
+
+        with self.lock:
+            for _, key, value, expires, hits, protected, size in sorted(chosen):
+                # Replace an entry that is already cached (from either segment), as put() does
+                for segment in (self.protected, self.probation):
+                    if key in segment:
+                        self.bytes -= segment.pop(key)[2]
+                self.negative.pop(key, None)
+                expires_at = None if expires is None else now + (expires - now_wall)
+                segment = self.protected if protected and self.policy != "lru" else self.probation
+                segment[key] = (value, expires_at, size)
+                self.bytes += size
+                if hits:
+                    self.hit_counts[key] = hits
+                if self.sketch:
+                    for _ in range(min(hits, 15)):
+                        self.sketch.add(key)
+            while len(self.protected) > self.protected_max:
+                demoted_key, demoted = self.protected.popitem(last=False)
+                self.probation[demoted_key] = demoted
+        return len(chosen)
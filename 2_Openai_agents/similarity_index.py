@@ -0,0 +1,111 @@
+# Vectorized top-k cosine similarity for the embedding agents (2_3, 2_5, 2_6, 2_7)
+#
+# The agents used to loop over every stored embedding in Python and call
+# cosine_similarity(), which recomputes both norms on each comparison.
+# SimilarityIndex normalizes every vector once and keeps them in one contiguous
+# matrix, so a search is a single matrix-vector product plus np.argpartition:
+#
+#   index = SimilarityIndex(topics, embedding_model.encode(answers))
+#   index.search(embedding_model.encode("how long is shipping?"), k=3)
+#   # -> [("shipping_time", 0.71), ("return_policy", 0.32), ...]
+#
+#   index.search_batch(embedding_model.encode(questions), k=3)   # many queries at once
+#
+# dtype="float16" halves the memory, but scores several times slower (numpy has no
+# fast float16 matmul, so rows are converted to float32 block by block). Above
+# `ann_threshold` entries an approximate HNSW index (faiss) is used when faiss is
+# installed; without it every search stays exact.
+#
+#   python bench_similarity_index.py   # loop vs index at 1k / 100k / 1M entries
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # optional: exact search only
+    faiss = None
+
+BLOCK_ROWS = 65_536  # float16 rows converted to float32 at a time
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class SimilarityIndex:
+    def __init__(self, keys=(), vectors=None, dtype="float32", ann_threshold=200_000):
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported dtype {dtype!r}")
+        self.dtype = np.dtype(dtype)
+        self.ann_threshold = ann_threshold
+        self.keys = []
+        self.matrix = None
+        self.ann = None
+        if vectors is not None:
+            self.add(keys, vectors)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, keys, vectors):
+        """Appends keys with their embeddings (one row per key)."""
+        keys = list(keys)
+        if not keys and not np.size(vectors):
+            return  # nothing to add (e.g. a document without text)
+        vectors = normalize(np.atleast_2d(vectors))
+        if len(keys) != len(vectors):
+            raise ValueError(f"{len(keys)} keys but {len(vectors)} vectors")
+        block = vectors.astype(self.dtype)
+        self.matrix = block if self.matrix is None else np.concatenate([self.matrix, block])
+        self.keys.extend(keys)
+        self.ann = None  # rebuilt on the next search if still needed
+
+    def _use_ann(self):
+        if faiss is None or len(self) < self.ann_threshold:
+            return False
+        if self.ann is None:
+            # Inner product on normalized vectors = cosine similarity
+            self.ann = faiss.IndexHNSWFlat(self.matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            self.ann.hnsw.efSearch = 64
+            self.ann.add(np.ascontiguousarray(self.matrix, dtype=np.float32))
+        return True
+
+    def scores(self, queries):
+        """Cosine similarity of each query (rows) against every entry: shape (queries, entries)."""
+        queries = normalize(np.atleast_2d(queries))
+        if self.dtype == np.float32:
+            return queries @ self.matrix.T
+        out = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), BLOCK_ROWS):
+            block = self.matrix[start:start + BLOCK_ROWS].astype(np.float32)
+            out[:, start:start + BLOCK_ROWS] = queries @ block.T
+        return out
+
+    def search_batch(self, queries, k=1):
+        """Top-k [(key, score)] per query, best first."""
+        if not len(self):
+            return [[] for _ in np.atleast_2d(queries)]
+        k = min(k, len(self))
+        if self._use_ann():
+            found, ids = self.ann.search(normalize(np.atleast_2d(queries)), k)
+            return [[(self.keys[i], float(s)) for s, i in zip(row_s, row_i) if i >= 0]
+                    for row_s, row_i in zip(found, ids)]
+
+        scores = self.scores(queries)
+        if k < len(self):
+            # O(n) selection of the k best, then only those k are sorted
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            top = np.broadcast_to(np.arange(len(self)), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        return [[(self.keys[i], float(s)) for i, s in zip(row_i, row_s)]
+                for row_i, row_s in zip(top, top_scores)]
+
+    def search(self, query, k=1):
+        """Top-k [(key, score)] for one query embedding, best first."""
+        return self.search_batch(np.atleast_2d(query), k)[0]
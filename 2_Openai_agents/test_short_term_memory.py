@@ -0,0 +1,44 @@
+# python -m pytest 2_Openai_agents/test_short_term_memory.py
+
+from collections import defaultdict
+
+from short_term_memory import FrequencySketch, ShortTermMemory, _size_of
+
+
+def test_sketch_rows_are_independent():
+    sketch = FrequencySketch()
+    by_first_row = defaultdict(list)
+    for key in [f"question {i}" for i in range(20_000)] + list(range(20_000)):
+        by_first_row[sketch._indexes(key)[0]].append(key)
+
+    pairs = [(keys[0], other) for keys in by_first_row.values() for other in keys[1:]]
+    assert len(pairs) > 1000  # plenty of keys collide in row 0...
+    in_every_row = [(a, b) for a, b in pairs if sketch._indexes(a) == sketch._indexes(b)]
+    assert len(in_every_row) <= 1  # ...but (almost) never in all rows
+
+
+def test_sketch_estimate_is_not_inflated_by_row_0_collisions():
+    sketch = FrequencySketch()
+    target = sketch._indexes("hot")[0]
+    cold = next(k for k in (f"cold {i}" for i in range(100_000)) if sketch._indexes(k)[0] == target)
+    for _ in range(10):
+        sketch.add("hot")
+    assert sketch.estimate("hot") == 10
+    assert sketch.estimate(cold) < 10
+
+
+def test_restore_replaces_existing_entries(tmp_path):
+    path = str(tmp_path / "stm.json.gz")
+    saved = ShortTermMemory(policy="slru")
+    saved.put("q1", "old answer")
+    saved.get("q1")  # second hit: promoted to the protected segment
+    saved.put("q2", "answer 2")
+    saved.save(path)
+
+    memory = ShortTermMemory(policy="slru")
+    memory.put("q1", "newer answer")
+    assert memory.restore(path) == 2
+
+    assert not ("q1" in memory.protected and "q1" in memory.probation)
+    assert len(memory) == 2
+    assert memory.bytes == _size_of("q1", "old answer") + _size_of("q2", "answer 2")
@@ -6,6 +6,10 @@ from dotenv import load_dotenv
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_anthropic import ChatAnthropic
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 load_dotenv()
 
@@ -31,6 +35,7 @@ llm = ChatAnthropic(
     model="claude-3-5-sonnet-20240620",
     anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
     streaming=True,
+    callbacks=[langchain_callback()],
 )
 
 # Tools
@@ -12,6 +12,11 @@ from dotenv import load_dotenv
 
 import chromadb
 from sentence_transformers import SentenceTransformer
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 # Load environment variables (expects OPENAI_API_KEY in .env)
 load_dotenv(override=True)
@@ -70,7 +75,7 @@ def search_house_prices(query: str) -> str:
 # ------------------------------
 
 def build_graph():
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, callbacks=[langchain_callback()])
 
     # Agent that knows about our tool
     agent = create_react_agent(
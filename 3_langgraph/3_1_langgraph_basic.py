@@ -3,13 +3,17 @@ from langchain_openai import ChatOpenAI
 from typing import TypedDict
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 # --- Load environment variables ---
 load_dotenv(override=True)
 api_key = os.getenv("OPENAI_API_KEY")
 
 # --- Initialize the LLM ---
-llm = ChatOpenAI(api_key=api_key, model="gpt-4o-mini")
+llm = ChatOpenAI(api_key=api_key, model="gpt-4o-mini", callbacks=[langchain_callback()])
 
 # --- Define the state structure ---
 class GraphState(TypedDict):
@@ -5,6 +5,10 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 # --------------------------
 # Define shared state
@@ -21,7 +25,7 @@ class AgentState(TypedDict):
 # Initialize LLM
 # --------------------------
 load_dotenv(override=True)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3, callbacks=[langchain_callback()])
 
 news_key = os.getenv("NEWS_API_KEY")
 
@@ -5,6 +5,11 @@ import requests
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 # Define the state
 class AgentState(TypedDict):
@@ -16,7 +21,7 @@ class AgentState(TypedDict):
 
 # Initialize LLM
 load_dotenv(override=True)
-llm = ChatOpenAI(model="gpt-4", temperature=0)
+llm = ChatOpenAI(model="gpt-4", temperature=0, callbacks=[langchain_callback()])
 
 def fetch_code(repo_url: str, path: str = "") -> str:
     """Recursively fetch Java code from a GitHub repo."""
@@ -6,6 +6,10 @@ from langchain_community.vectorstores import FAISS
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import langchain_callback  # noqa: E402
 
 load_dotenv()
 
@@ -20,7 +24,8 @@ class State(TypedDict):
 vectordb = FAISS.load_local("c://code//agenticai//3_langgraph//product_embeddings_faiss", 
     HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2"), 
     allow_dangerous_deserialization=True)
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"))
+llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=os.getenv("GOOGLE_API_KEY"),
+                             callbacks=[langchain_callback()])
 
 # Nodes
 def classify(state: State) -> State:
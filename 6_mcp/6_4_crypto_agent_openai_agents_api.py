@@ -3,8 +3,14 @@ from dotenv import load_dotenv
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from agents import Agent, Runner, function_tool
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_agents, tag  # noqa: E402
 
 load_dotenv(override=True)
+instrument_agents()  # Agents SDK calls are logged to llm_usage.jsonl, tagged per agent
 
 # Global MCP session
 mcp_session = None
@@ -52,10 +58,11 @@ async def main():
             await session.initialize()
             
             # Now run the agent
-            result = await Runner.run(
-                crypto_agent, 
-                "Get the price of bitcoin in USD."
-            )
+            with tag(f"agent:{crypto_agent.name}"):
+                result = await Runner.run(
+                    crypto_agent, 
+                    "Get the price of bitcoin in USD."
+                )
             print("=== Crypto Agent ===")
             print(result.final_output)
 
@@ -1,9 +1,15 @@
 # pip install boto3
 import boto3
 import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_bedrock  # noqa: E402
 
 # Create a Bedrock client (region must support Bedrock, e.g. us-east-1 or us-west-2)
-client = boto3.client("bedrock-runtime", region_name="us-east-1")
+# invoke_model calls are logged to llm_usage.jsonl (tokens come from the response headers)
+client = instrument_bedrock(boto3.client("bedrock-runtime", region_name="us-east-1"))
 
 # Define the model
 model_id = "amazon.titan-text-lite-v1"
@@ -1,11 +1,16 @@
 # pip install boto3
 import boto3
 import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "1_Openai"))
+from llm_accounting import instrument_bedrock  # noqa: E402
 
 # ----------------------------
 # Bedrock Setup
 # ----------------------------
-client = boto3.client("bedrock-runtime", region_name="us-east-1")
+client = instrument_bedrock(boto3.client("bedrock-runtime", region_name="us-east-1"))
 model_id = "amazon.titan-text-lite-v1"
 
 